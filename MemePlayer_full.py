@@ -10,6 +10,13 @@ Features added on top of your SFX-enabled player:
 - Video loop toggle (checkbox) - when enabled, videos loop until skipped
 - SFX (assets/sfx/) support including mp3
 
+Image decode benchmarks (JPEG draft vs. full decode; thread vs. process-pool decoding):
+    python MemePlayer_full.py --bench-decode FOLDER
+    python MemePlayer_full.py --bench-backends FOLDER
+
+Images too large to decode within IMAGE_MEMORY_LIMIT_BYTES are shrunk by a child
+process (`--shrink`, used internally) and the result kept in the disk cache.
+
 Dependencies:
     pip install pillow python-vlc keyboard
 
@@ -19,13 +26,27 @@ Place SFX files in assets/sfx/ and BGM tracks in assets/bgm/
 
 import os
 import sys
+import bisect
+import collections
+import concurrent.futures
+import hashlib
+import itertools
 import json
+import queue
 import random
+import signal
+import sqlite3
+import subprocess
+import tempfile
 import threading
+from array import array
 import time
+import unicodedata
+from multiprocessing import get_context, shared_memory
 import tkinter as tk
+import tkinter.font as tkfont
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk
+from PIL import Image, ImageTk, features
 
 # Optional global hotkeys library
 try:
@@ -41,6 +62,25 @@ try:
 except Exception:
     VLC_AVAILABLE = False
 
+# Optional NumPy for image transitions (without it images simply cut)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except Exception:
+    NUMPY_AVAILABLE = False
+
+# Linux inotify through libc for the folder watcher (polling is used elsewhere)
+try:
+    import ctypes
+    import ctypes.util
+    _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    _libc.inotify_init1.argtypes = [ctypes.c_int]
+    _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    _libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    INOTIFY_AVAILABLE = sys.platform.startswith('linux')
+except Exception:
+    INOTIFY_AVAILABLE = False
+
 # Windows winsound fallback for .wav sfx
 try:
     import winsound
@@ -55,6 +95,9 @@ PLAYABLE_EXTS = IMAGE_EXTS + VIDEO_EXTS
 
 # SFX formats (supports mp3)
 SFX_EXTS = ('.wav', '.mp3', '.ogg', '.flac', '.m4a', '.aac')
+# Sound effects share this many reusable players; when all are busy the sound
+# started longest ago is cut off for the new one
+SFX_VOICES = 4
 BGM_EXTS = ('.mp3', '.wav', '.ogg', '.flac', '.m4a', '.aac')
 
 # Assets folders
@@ -62,12 +105,324 @@ BASE_DIR = os.path.dirname(__file__)
 ASSETS_SFX_DIR = os.path.join(BASE_DIR, 'assets', 'sfx')
 ASSETS_BGM_DIR = os.path.join(BASE_DIR, 'assets', 'bgm')
 PLAYLISTS_FILE = os.path.join(BASE_DIR, 'playlists.json')
+VLC_PROFILES_FILE = os.path.join(BASE_DIR, 'vlc_profiles.json')
+CACHE_DIR = os.path.join(BASE_DIR, 'cache')
+
+# Persistent media catalog (SQLite). Bump the version when the schema changes
+# and add an upgrade step to CATALOG_UPGRADES if old data can be carried over.
+CATALOG_FILE = os.path.join(CACHE_DIR, 'catalog.sqlite3')
+CATALOG_SCHEMA_VERSION = 2
+CATALOG_UPGRADES = {  # from_version -> list of SQL statements reaching from_version + 1
+    # version 1 could lose subfolders of a cancelled scan: list every directory from disk once
+    1: ['UPDATE dirs SET mtime_ns = -1'],
+}
+
+# Folder scanning: files are streamed to the UI in batches of this size, or
+# sooner if this many seconds pass without a full batch (slow network shares)
+SCAN_BATCH_SIZE = 500
+SCAN_FLUSH_SECONDS = 0.25
+
+# Folder watcher: changes are coalesced for WATCH_DEBOUNCE_SECONDS before they
+# are applied; the polling backend re-checks directory mtimes every WATCH_POLL_SECONDS
+WATCH_DEBOUNCE_SECONDS = 0.5
+WATCH_POLL_SECONDS = 5
+
+# Metadata probing pool: worker threads, and how long to wait on libvlc per video
+PROBE_WORKERS = 2
+PROBE_TIMEOUT_SECONDS = 5
+
+# Image prefetch: how many upcoming items are decoded ahead, and by how many threads
+PREFETCH_DEPTH = 3
+PREFETCH_WORKERS = 2
+
+# Read-ahead: the source files of this many upcoming items are pulled into the OS
+# page cache (for network mounts, where the first read of a file is the slow part),
+# reading at most READAHEAD_FILE_BYTES of each and READAHEAD_BYTES per request
+READAHEAD_DEPTH = 6
+READAHEAD_BYTES = 256 * 1024 * 1024
+READAHEAD_FILE_BYTES = 64 * 1024 * 1024
+READAHEAD_CHUNK_BYTES = 1024 * 1024
+
+# Upcoming videos whose libvlc media is created and parsed ahead of time
+VIDEO_PRELOAD_DEPTH = 1
+
+# A video coming up next is opened in a second, hidden player and paused on its
+# first frame, so switching to it is a swap; give up if it is not ready this fast
+STANDBY_PRIME_TIMEOUT_SECONDS = 5
+
+# A video that never gets going (stuck opening or buffering, no player events) is
+# skipped after the meme interval plus this many seconds; once it is playing, after
+# this long without progress
+VIDEO_STALL_SECONDS = 10
+
+# JPEGs are decoded at a reduced DCT scale (1/2, 1/4, 1/8) just above the display
+# size before the final LANCZOS resize; set False to always decode at full resolution
+JPEG_DRAFT_DECODE = True
+
+# Progressive rendering: when the display-size image is not ready yet, show a
+# quick low-quality preview (after waiting at most PREVIEW_BUDGET_MS for a running
+# prefetch) and swap in the full-quality resize once a worker has it. Sources up
+# to PREVIEW_MIN_PIXELS decode fast enough to skip the preview. Formats without a
+# reduced decode (PNG, WebP, GIF) get no preview: the outgoing image stays up
+# until a worker has decoded them.
+PROGRESSIVE_RENDER = True
+PREVIEW_BUDGET_MS = 30
+PREVIEW_MIN_PIXELS = 4 * 1000 * 1000
+
+# Decoded-size ceiling (bytes) for any one image in this process, checked from
+# the header before decoding. Larger images are shrunk by a short-lived child
+# process (address space capped where the OS allows) and cached on disk; images
+# over PROXY_MEMORY_LIMIT_BYTES are refused. These replace Pillow's pixel-count
+# decompression-bomb check.
+IMAGE_MEMORY_LIMIT_BYTES = 256 * 1024 * 1024
+PROXY_MEMORY_LIMIT_BYTES = 2 * 1024 * 1024 * 1024
+PROXY_TIMEOUT_SECONDS = 120
+Image.MAX_IMAGE_PIXELS = None
+
+# Resizing the window re-renders the image once events stop for this long (ms)
+RESIZE_SETTLE_MS = 60
+
+# Decode images in this many worker processes (results come back through shared
+# memory); 0 decodes on threads inside the UI process
+DECODE_PROCESSES = 0
+
+# Memory budget (bytes of decoded pixels) for display-ready images kept for reuse
+IMAGE_CACHE_BYTES = 64 * 1024 * 1024
+
+# On-disk cache of display-size images and thumbnails, shared across sessions
+DISK_CACHE_DIR = os.path.join(CACHE_DIR, 'images')
+DISK_CACHE_BYTES = 512 * 1024 * 1024
+
+# Optional display-resolution proxies of heavy videos (more pixels than
+# VIDEO_PROXY_MIN_PIXELS or a higher bitrate than VIDEO_PROXY_MIN_KBPS), played in
+# place of the original once ready. One niced child process transcodes at a time and
+# is suspended while a video plays; the proxy directory is trimmed by least recent use.
+VIDEO_PROXIES = False
+VIDEO_PROXY_DIR = os.path.join(CACHE_DIR, 'proxies')
+VIDEO_PROXY_BYTES = 8 * 1024 * 1024 * 1024
+VIDEO_PROXY_HEIGHT = 720
+VIDEO_PROXY_KBPS = 2500
+VIDEO_PROXY_MIN_PIXELS = 1920 * 1080
+VIDEO_PROXY_MIN_KBPS = 20000
+VIDEO_PROXY_TIMEOUT_SECONDS = 3600
+
+# Animated GIF/WebP: extensions checked for animation, frames decoded ahead, and
+# the delay used for frames that ask for less than ANIM_MIN_FRAME_MS
+ANIMATED_EXTS = ('.gif', '.webp')
+ANIM_BUFFER_FRAMES = 8
+ANIM_MIN_FRAME_MS = 20
+ANIM_DEFAULT_FRAME_MS = 100
+
+# Image-to-image transition ('crossfade', 'slide' or 'none'), its length, and the
+# frame budget it is paced to; frames that miss their slot are dropped
+TRANSITIONS = ('none', 'crossfade', 'slide')
+TRANSITION = 'crossfade'
+TRANSITION_MS = 300
+TRANSITION_FRAME_MS = 33
+
+# Live search: queries run this long (ms) after the last keystroke
+SEARCH_DEBOUNCE_MS = 150
+
+# Thumbnail grid browser: cell image size and the workers generating thumbnails
+THUMB_SIZE = (160, 120)
+THUMB_WORKERS = 2
+# thumbnails have their own memory cache so browsing never evicts playback images
+THUMB_CACHE_BYTES = 16 * 1024 * 1024
+
+# poster frames: a still of each video, shown the moment it becomes current and in the
+# grid; taken at this fraction of the video's length (0 = first frame) and kept at most
+# POSTER_SIZE in the disk cache, next to the thumbnails
+POSTER_POSITION = 0.1
+POSTER_SIZE = (1280, 720)
+POSTER_TIMEOUT_SECONDS = 10
+
+# How often (ms) the Tk loop picks up results posted by worker threads
+UI_POLL_MS = 30
+
+# libvlc performance profiles: instance arguments and per-media options. The active
+# one is chosen (and profiles edited or added) in VLC_PROFILES_FILE, written with
+# these defaults on first run; changes apply from the next launch.
+DEFAULT_VLC_PROFILE = 'local'
+DEFAULT_VLC_PROFILES = {
+    # files on a local disk: small caches so playback starts and seeks quickly
+    'local': {
+        'instance': ['--quiet', '--file-caching=150', '--no-stats', '--no-lua', '--no-video-title-show',
+                     '--no-sub-autodetect-file'],
+        'media': [':file-caching=150'],
+    },
+    # NFS/SMB shares: deep caches so a slow read does not stall the picture
+    'network': {
+        'instance': ['--quiet', '--file-caching=3000', '--network-caching=3000', '--no-stats', '--no-lua',
+                     '--no-video-title-show', '--no-sub-autodetect-file'],
+        'media': [':file-caching=3000', ':network-caching=3000'],
+    },
+    # weak kiosk hardware: hardware decoding, few decoder threads, cheaper H.264 decode
+    'kiosk': {
+        'instance': ['--quiet', '--file-caching=1000', '--avcodec-hw=any', '--avcodec-threads=2',
+                     '--avcodec-skiploopfilter=4', '--no-stats', '--no-lua', '--no-video-title-show',
+                     '--no-sub-autodetect-file', '--no-osd'],
+        'media': [':file-caching=1000'],
+    },
+}
 
 # Helper: ensure asset dirs exist
 os.makedirs(ASSETS_SFX_DIR, exist_ok=True)
 os.makedirs(ASSETS_BGM_DIR, exist_ok=True)
 
 
+# ---------------- Shared libvlc instance ----------------
+def _valid_vlc_profile(profile):
+    """True for {'instance': [str, ...], 'media': [str, ...]} (either list may be left out)."""
+    if not isinstance(profile, dict):
+        return False
+    for key in ('instance', 'media'):
+        value = profile.get(key, [])
+        if not isinstance(value, list) or not all(isinstance(arg, str) for arg in value):
+            return False
+    return True
+
+
+def load_vlc_profile(path=VLC_PROFILES_FILE):
+    """(name, {'instance': [...], 'media': [...]}) of the active profile in the
+    config file; the file is created with the defaults if it does not exist.
+    A malformed file or profile is ignored in favour of DEFAULT_VLC_PROFILES.
+    """
+    config = None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'active': DEFAULT_VLC_PROFILE, 'profiles': DEFAULT_VLC_PROFILES}, f, indent=2)
+        except Exception:
+            pass
+    except Exception:
+        pass
+    config = config if isinstance(config, dict) else {}
+    profiles = dict(DEFAULT_VLC_PROFILES)
+    custom = config.get('profiles')
+    if isinstance(custom, dict):
+        profiles.update((k, v) for k, v in custom.items() if _valid_vlc_profile(v))
+    name = config.get('active', DEFAULT_VLC_PROFILE)
+    if not isinstance(name, str) or name not in profiles:
+        name = DEFAULT_VLC_PROFILE
+    profile = profiles[name]
+    return name, {'instance': list(profile.get('instance', [])), 'media': list(profile.get('media', []))}
+
+
+vlc_profile_name, vlc_profile = None, {'instance': [], 'media': []}
+_vlc_instance = None
+_vlc_failed = False
+_vlc_lock = threading.Lock()
+
+
+def get_vlc_instance(wait=True):
+    """The one libvlc instance shared by video, SFX, BGM and the prober, created
+    on first use (None without VLC). With wait=False, returns None instead of
+    blocking while another thread is still creating it.
+    """
+    global _vlc_instance, _vlc_failed, vlc_profile_name, vlc_profile
+    if not VLC_AVAILABLE or _vlc_failed:
+        return None
+    if _vlc_instance is not None:
+        return _vlc_instance
+    if not _vlc_lock.acquire(blocking=wait):
+        return None
+    try:
+        if _vlc_instance is None:
+            try:
+                vlc_profile_name, vlc_profile = load_vlc_profile()
+                _vlc_instance = vlc.Instance(vlc_profile['instance'])
+            except Exception:
+                _vlc_failed = True
+        return _vlc_instance
+    finally:
+        _vlc_lock.release()
+
+
+def new_vlc_media(path):
+    """vlc.Media for path on the shared instance, with the active profile's media options."""
+    return get_vlc_instance().media_new(path, *vlc_profile['media'])
+
+
+def process_rss_bytes():
+    """Resident memory of this process, or None where it cannot be read cheaply."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except Exception:
+        return None
+
+
+def prewarm_vlc():
+    """Create the shared instance in the background; loading libvlc's plugins takes a while."""
+    if VLC_AVAILABLE:
+        threading.Thread(target=get_vlc_instance, daemon=True).start()
+
+
+# ---------------- SFX voices ----------------
+class SfxVoicePool:
+    """Fixed set of libvlc players ("voices") for sound effects, created as
+    needed up to `voices` and reused for every sound after that. An idle or
+    finished voice is taken first; with all of them busy, the one started
+    longest ago is stopped and reused. Nothing waits for a sound to end, so
+    there is no thread per sound, and a voice only holds its current media.
+    """
+
+    def __init__(self, voices=SFX_VOICES):
+        self.voices = max(1, voices)
+        self.stolen = 0
+        self._voices = []  # [player, monotonic time of its last play()]
+
+    def play(self, path, volume):
+        """Start path on a voice; False if libvlc could not play it."""
+        try:
+            if get_vlc_instance() is None:
+                return False
+            voice = self._take_voice()
+            player = voice[0]
+            media = new_vlc_media(path)
+            player.set_media(media)
+            media.release()  # the player holds its own reference until the next set_media
+            player.audio_set_volume(int(volume))
+            player.play()
+        except Exception:
+            return False
+        voice[1] = time.monotonic()
+        return True
+
+    def _take_voice(self):
+        done = (vlc.State.NothingSpecial, vlc.State.Stopped, vlc.State.Ended, vlc.State.Error)
+        for voice in self._voices:
+            if voice[0].get_state() in done:
+                return voice
+        if len(self._voices) < self.voices:
+            voice = [get_vlc_instance().media_player_new(), 0.0]
+            self._voices.append(voice)
+            return voice
+        voice = min(self._voices, key=lambda v: v[1])
+        voice[0].stop()
+        self.stolen += 1
+        return voice
+
+    def set_volume(self, volume):
+        for player, _started in self._voices:
+            try:
+                player.audio_set_volume(int(volume))
+            except Exception:
+                pass
+
+    def close(self):
+        for player, _started in self._voices:
+            try:
+                player.stop()
+                player.release()
+            except Exception:
+                pass
+        self._voices = []
+
+
 class BackgroundMusicPlayer:
     """Simple BGM player using VLC if available, otherwise does nothing.
     Plays tracks from a provided list in order, looping the BGM playlist.
@@ -80,15 +435,7 @@ class BackgroundMusicPlayer:
         self._thread = None
         self._stop_event = threading.Event()
         self.volume = 50
-        self.vlc_instance = None
-        self.player = None
-        if VLC_AVAILABLE:
-            try:
-                self.vlc_instance = vlc.Instance()
-                self.player = self.vlc_instance.media_player_new()
-            except Exception:
-                self.vlc_instance = None
-                self.player = None
+        self.player = None  # created on first play, on the shared libvlc instance
 
     def load_folder(self, folder=ASSETS_BGM_DIR):
         fl = []
@@ -110,10 +457,20 @@ class BackgroundMusicPlayer:
             except Exception:
                 pass
 
+    def _ensure_player(self):
+        if self.player is None:
+            instance = get_vlc_instance()
+            if instance is not None:
+                try:
+                    self.player = instance.media_player_new()
+                except Exception:
+                    self.player = None
+        return self.player
+
     def play(self):
         if not self.bgm_files:
             return
-        if not VLC_AVAILABLE or not self.player:
+        if not VLC_AVAILABLE or not self._ensure_player():
             return
         self.playing = True
         self._stop_event.clear()
@@ -152,12 +509,13 @@ class BackgroundMusicPlayer:
         self._play_current()
 
     def _play_current(self):
-        if not VLC_AVAILABLE or not self.player or not self.bgm_files:
+        if not VLC_AVAILABLE or not self._ensure_player() or not self.bgm_files:
             return
         f = self.bgm_files[self.index]
         try:
-            media = self.vlc_instance.media_new(f)
+            media = new_vlc_media(f)
             self.player.set_media(media)
+            media.release()  # the player holds its own reference until the next set_media
             self.player.audio_set_volume(self.volume)
             self.player.play()
         except Exception:
@@ -184,17 +542,2344 @@ class BackgroundMusicPlayer:
                     time.sleep(t_sleep)
                     waited += t_sleep
             else:
-                # fallback: wait a fixed 30s per track if length unknown
-                waited = 0.0
-                while waited < 30 and not self._stop_event.is_set():
-                    time.sleep(t_sleep)
-                    waited += t_sleep
-            if self._stop_event.is_set():
-                break
-            # next track
-            self.index = (self.index + 1) % len(self.bgm_files)
-        # cleanup
-        self.playing = False
+                # fallback: wait a fixed 30s per track if length unknown
+                waited = 0.0
+                while waited < 30 and not self._stop_event.is_set():
+                    time.sleep(t_sleep)
+                    waited += t_sleep
+            if self._stop_event.is_set():
+                break
+            # next track
+            self.index = (self.index + 1) % len(self.bgm_files)
+        # cleanup
+        self.playing = False
+
+
+class MediaCatalog:
+    """Persistent SQLite index of playable files under each scanned folder.
+    Stores size, mtime, media kind and probed metadata per file, plus the mtime
+    of every directory so a known folder can be re-validated by stat'ing its
+    directories only. All calls share one connection guarded by a lock, so the
+    catalog can be used from worker threads.
+    """
+
+    def __init__(self, db_path=CATALOG_FILE):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = None
+        try:
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._migrate()
+        except Exception:
+            self._conn = None
+
+    @property
+    def available(self):
+        return self._conn is not None
+
+    def _migrate(self):
+        version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+        while version in CATALOG_UPGRADES:
+            with self._conn:
+                for stmt in CATALOG_UPGRADES[version]:
+                    self._conn.execute(stmt)
+                version += 1
+                self._conn.execute(f'PRAGMA user_version = {version}')
+        if version == CATALOG_SCHEMA_VERSION:
+            return
+        # unknown (or first-run) layout: start from an empty catalog
+        with self._conn:
+            for table in ('roots', 'dirs', 'files'):
+                self._conn.execute(f'DROP TABLE IF EXISTS {table}')
+            self._conn.execute('CREATE TABLE roots (root TEXT PRIMARY KEY, scanned_at REAL)')
+            self._conn.execute('CREATE TABLE dirs (root TEXT NOT NULL, path TEXT NOT NULL, parent TEXT, '
+                               'mtime_ns INTEGER NOT NULL, PRIMARY KEY (root, path))')
+            self._conn.execute('CREATE INDEX dirs_parent ON dirs (root, parent)')
+            # relkey is the path relative to root with separators replaced by \0, so that
+            # ORDER BY relkey matches the scanner's per-component sort order
+            self._conn.execute('CREATE TABLE files (root TEXT NOT NULL, path TEXT NOT NULL, dir TEXT NOT NULL, '
+                               'relkey TEXT NOT NULL, size INTEGER, mtime_ns INTEGER, kind TEXT, meta TEXT, '
+                               'PRIMARY KEY (root, path))')
+            self._conn.execute('CREATE INDEX files_dir ON files (root, dir)')
+            self._conn.execute('CREATE INDEX files_order ON files (root, relkey)')
+            self._conn.execute(f'PRAGMA user_version = {CATALOG_SCHEMA_VERSION}')
+
+    def cached_files(self, root):
+        """Sorted file list from the last complete scan of root, or [] if root is unknown."""
+        if not self.available:
+            return []
+        with self._lock:
+            if not self._conn.execute('SELECT 1 FROM roots WHERE root=?', (root,)).fetchone():
+                return []
+            rows = self._conn.execute('SELECT path FROM files WHERE root=? ORDER BY relkey', (root,))
+            return [r[0] for r in rows]
+
+    def dir_mtimes(self, root):
+        with self._lock:
+            if not self.available:
+                return {}
+            return dict(self._conn.execute('SELECT path, mtime_ns FROM dirs WHERE root=?', (root,)))
+
+    def children(self, root, path):
+        """Cached (name, path, is_dir) entries of a directory, sorted like os.scandir results in FolderScanner."""
+        with self._lock:
+            if not self.available:
+                return []
+            dirs = [r[0] for r in self._conn.execute('SELECT path FROM dirs WHERE root=? AND parent=?', (root, path))]
+            files = [r[0] for r in self._conn.execute('SELECT path FROM files WHERE root=? AND dir=?', (root, path))]
+        entries = [(os.path.basename(d), d, True) for d in dirs]
+        entries += [(os.path.basename(f), f, False) for f in files]
+        entries.sort()
+        return entries
+
+    def replace_dir(self, root, path, parent, mtime_ns, files, subdirs):
+        """Record a freshly listed directory. files is a list of (path, size, mtime_ns).
+        Probed metadata survives for files whose size and mtime did not change.
+        Subdirectories not listed yet get a placeholder row that never matches
+        their mtime, so a scan cancelled before reaching them still lists them.
+        """
+        with self._lock:
+            if not self.available:
+                return
+            old = {p: (size, mtime, meta) for p, size, mtime, meta in self._conn.execute(
+                'SELECT path, size, mtime_ns, meta FROM files WHERE root=? AND dir=?', (root, path))}
+            for (d,) in self._conn.execute('SELECT path FROM dirs WHERE root=? AND parent=?',
+                                           (root, path)).fetchall():
+                if d not in subdirs:
+                    self._forget_tree(root, d)
+            self._conn.execute('DELETE FROM files WHERE root=? AND dir=?', (root, path))
+            rows = []
+            for fpath, size, mtime in files:
+                prev = old.get(fpath)
+                meta = prev[2] if prev and prev[:2] == (size, mtime) else None
+                kind = 'video' if fpath.lower().endswith(VIDEO_EXTS) else 'image'
+                relkey = fpath[len(root):].replace(os.sep, '\0')
+                rows.append((root, fpath, path, relkey, size, mtime, kind, meta))
+            self._conn.executemany('INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            self._conn.execute('INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?)', (root, path, parent, mtime_ns))
+            self._conn.executemany('INSERT OR IGNORE INTO dirs VALUES (?, ?, ?, -1)',
+                                   [(root, d, path) for d in subdirs])
+
+    def _forget_tree(self, root, path):
+        prefix = path + os.sep
+        for table in ('dirs', 'files'):
+            self._conn.execute(f'DELETE FROM {table} WHERE root=? AND (path=? OR substr(path, 1, ?)=?)',
+                               (root, path, len(prefix), prefix))
+
+    def metadata(self, root):
+        """Probed metadata of root's files: {path: dict}."""
+        with self._lock:
+            if not self.available:
+                return {}
+            rows = self._conn.execute('SELECT path, meta FROM files WHERE root=? AND meta IS NOT NULL',
+                                      (root,)).fetchall()
+        result = {}
+        for path, meta in rows:
+            try:
+                result[path] = json.loads(meta)
+            except ValueError:
+                pass
+        return result
+
+    def set_meta(self, root, path, meta):
+        """Store probed metadata for one of root's files."""
+        with self._lock:
+            if not self.available:
+                return
+            # the full primary key: a lookup on path alone would scan the whole table
+            self._conn.execute('UPDATE files SET meta=? WHERE root=? AND path=?', (json.dumps(meta), root, path))
+
+    def mark_complete(self, root):
+        with self._lock:
+            if not self.available:
+                return
+            self._conn.execute('INSERT OR REPLACE INTO roots VALUES (?, ?)', (root, time.time()))
+            self._conn.commit()
+
+    def forget_root(self, root):
+        """Drop everything known about root so the next scan rebuilds it from scratch."""
+        if not self.available:
+            return
+        with self._lock:
+            for table in ('roots', 'dirs', 'files'):
+                self._conn.execute(f'DELETE FROM {table} WHERE root=?', (root,))
+            self._conn.commit()
+
+    def commit(self):
+        if not self.available:
+            return
+        with self._lock:
+            try:
+                self._conn.commit()
+            except Exception:
+                pass
+
+    def close(self):
+        if not self.available:
+            return
+        with self._lock:
+            try:
+                self._conn.commit()
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+
+class FolderScanner:
+    """Walks a folder tree on a worker thread using os.scandir and streams
+    playable files back in batches, so huge libraries never block the UI.
+    Files are emitted in sorted (per path component) order, so batches can
+    simply be appended. Callbacks run on the worker thread.
+
+    With a MediaCatalog, directories whose mtime matches the catalog are listed
+    from the catalog instead of the disk, and changed ones are written back.
+    """
+
+    def __init__(self, folder, on_batch, on_done, exts=PLAYABLE_EXTS, catalog=None):
+        self.folder = folder
+        self.exts = exts
+        self.on_batch = on_batch  # on_batch(scanner, paths)
+        self.on_done = on_done  # on_done(scanner)
+        self.catalog = catalog if catalog is not None and catalog.available else None
+        self.files_found = 0
+        self.dirs_scanned = 0
+        self.dirs_changed = 0
+        self._known_dirs = {}
+        self._cancel_event = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def sort_key(root, path):
+        """Key reproducing the order files are emitted in (per path component)."""
+        return path[len(root):].split(os.sep) if root else [path]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def _list_dir(self, path, parent):
+        self.dirs_scanned += 1
+        mtime_ns = None
+        if self.catalog:
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                return []
+            if self._known_dirs.get(path) == mtime_ns:
+                return self.catalog.children(self.folder, path)
+        entries = []
+        stats = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            entries.append((entry.name, entry.path, True))
+                        elif entry.name.lower().endswith(self.exts):
+                            entries.append((entry.name, entry.path, False))
+                            if self.catalog:
+                                st = entry.stat()
+                                stats.append((entry.path, st.st_size, st.st_mtime_ns))
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+        entries.sort()
+        if self.catalog:
+            self.dirs_changed += 1
+            subdirs = {p for _n, p, d in entries if d}
+            self.catalog.replace_dir(self.folder, path, parent, mtime_ns, stats, subdirs)
+        return entries
+
+    def _run(self):
+        if self.catalog:
+            self._known_dirs = self.catalog.dir_mtimes(self.folder)
+        batch = []
+        last_flush = time.monotonic()
+        # stack of (path, is_dir, parent); children are pushed in reverse so they pop in order
+        stack = [(self.folder, True, None)]
+        while stack and not self.cancelled:
+            path, is_dir, parent = stack.pop()
+            if not is_dir:
+                batch.append(path)
+                continue
+            for _name, child, child_is_dir in reversed(self._list_dir(path, parent)):
+                stack.append((child, child_is_dir, path))
+            now = time.monotonic()
+            if len(batch) >= SCAN_BATCH_SIZE or (batch and now - last_flush >= SCAN_FLUSH_SECONDS):
+                self._flush(batch)
+                batch = []
+                last_flush = now
+        if self.cancelled:
+            if self.catalog:
+                self.catalog.commit()
+            return
+        if batch:
+            self._flush(batch)
+        if self.catalog:
+            self.catalog.mark_complete(self.folder)
+        self.on_done(self)
+
+    def _flush(self, batch):
+        if self.catalog:
+            self.catalog.commit()
+        self.files_found += len(batch)
+        self.on_batch(self, batch)
+
+
+class FolderWatcher:
+    """Watches a scanned folder tree and reports playable files that appeared
+    or disappeared as small deltas: on_change(watcher, added, removed), called
+    on the worker thread. Renames show up as one removal plus one addition.
+
+    Uses inotify on Linux and falls back to polling directory mtimes elsewhere
+    (or when inotify watches run out). Either way a changed directory is
+    re-listed and diffed against what is known, so no events are lost to races.
+    """
+
+    # inotify masks (see <sys/inotify.h>)
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_NONBLOCK = 0o4000
+    WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+                  | IN_DELETE_SELF | IN_MOVE_SELF)
+
+    def __init__(self, folder, files, on_change, catalog=None, exts=PLAYABLE_EXTS):
+        self.folder = folder
+        self.exts = exts
+        self.on_change = on_change
+        self.backend = None  # 'inotify' or 'poll' once running
+        self._initial_files = list(files)
+        self._catalog = catalog if catalog is not None and catalog.available else None
+        self._dir_files = {}  # dir -> set of playable files directly inside
+        self._subdirs = {}  # dir -> set of child dirs
+        self._mtimes = {}  # dir -> mtime_ns when last listed
+        self._pending_added = set()
+        self._pending_removed = set()
+        self._fd = None
+        self._wd_to_dir = {}
+        self._dir_to_wd = {}
+        self._cancel_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._cancel_event.set()
+
+    # ----- known state -----
+    def _seed(self):
+        known_dirs = self._catalog.dir_mtimes(self.folder) if self._catalog else {}
+        if self.folder not in known_dirs:
+            # no catalog data: list the tree once (nothing is reported for it)
+            self._add_tree(self.folder, set())
+            return
+        for d, mtime in known_dirs.items():
+            self._track_dir(d, mtime)
+            if d != self.folder:
+                self._subdirs.setdefault(os.path.dirname(d), set()).add(d)
+        for f in self._initial_files:
+            self._dir_files.setdefault(os.path.dirname(f), set()).add(f)
+
+    def _track_dir(self, d, mtime):
+        self._mtimes[d] = mtime
+        self._dir_files.setdefault(d, set())
+        self._subdirs.setdefault(d, set())
+        if self._fd is not None:
+            wd = _libc.inotify_add_watch(self._fd, os.fsencode(d), self.WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), 'inotify_add_watch failed: ' + d)
+            self._wd_to_dir[wd] = d
+            self._dir_to_wd[d] = wd
+
+    def _list(self, d):
+        files, dirs = set(), set()
+        with os.scandir(d) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.add(entry.path)
+                    elif entry.name.lower().endswith(self.exts):
+                        files.add(entry.path)
+                except OSError:
+                    pass
+        return files, dirs
+
+    def _add_tree(self, d, added):
+        stack = [d]
+        while stack:
+            d = stack.pop()
+            try:
+                mtime = os.stat(d).st_mtime_ns
+                files, dirs = self._list(d)
+            except OSError:
+                continue
+            self._track_dir(d, mtime)
+            self._dir_files[d] = files
+            self._subdirs[d] = dirs
+            added.update(files)
+            stack.extend(dirs)
+
+    def _drop_tree(self, d, removed):
+        stack = [d]
+        while stack:
+            d = stack.pop()
+            removed.update(self._dir_files.pop(d, ()))
+            stack.extend(self._subdirs.pop(d, ()))
+            self._mtimes.pop(d, None)
+            wd = self._dir_to_wd.pop(d, None)
+            if wd is not None:
+                self._wd_to_dir.pop(wd, None)
+                _libc.inotify_rm_watch(self._fd, wd)
+
+    def _rescan_dir(self, d):
+        """Re-list one known directory and queue the differences."""
+        if d not in self._mtimes:
+            return
+        added, removed = set(), set()
+        try:
+            mtime = os.stat(d).st_mtime_ns
+            files, dirs = self._list(d)
+        except OSError:
+            # gone; its parent's rescan (or this drop) reports the files
+            self._drop_tree(d, removed)
+            parent = os.path.dirname(d)
+            self._subdirs.get(parent, set()).discard(d)
+            self._queue(added, removed)
+            return
+        self._mtimes[d] = mtime
+        old_files = self._dir_files.get(d, set())
+        added.update(files - old_files)
+        removed.update(old_files - files)
+        self._dir_files[d] = files
+        old_dirs = self._subdirs.get(d, set())
+        for gone in old_dirs - dirs:
+            self._drop_tree(gone, removed)
+        for new in dirs - old_dirs:
+            self._add_tree(new, added)
+        self._subdirs[d] = dirs
+        self._queue(added, removed)
+
+    def _queue(self, added, removed):
+        for p in removed:
+            if p in self._pending_added:
+                self._pending_added.discard(p)
+            else:
+                self._pending_removed.add(p)
+        for p in added:
+            if p in self._pending_removed:
+                self._pending_removed.discard(p)
+            else:
+                self._pending_added.add(p)
+
+    def _flush(self):
+        if not (self._pending_added or self._pending_removed) or self._cancel_event.is_set():
+            return
+        added, removed = sorted(self._pending_added), sorted(self._pending_removed)
+        self._pending_added, self._pending_removed = set(), set()
+        self.on_change(self, added, removed)
+
+    # ----- backends -----
+    def _run(self):
+        if INOTIFY_AVAILABLE:
+            try:
+                self._fd = _libc.inotify_init1(self.IN_NONBLOCK)
+                if self._fd < 0:
+                    raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+                self._seed()
+                self.backend = 'inotify'
+                self._run_inotify()
+                return
+            except Exception:
+                # e.g. out of inotify watches on a huge tree: fall back to polling
+                self._close_inotify()
+                self._dir_files, self._subdirs, self._mtimes = {}, {}, {}
+        try:
+            self._seed()
+        except Exception:
+            return
+        self.backend = 'poll'
+        self._run_poll()
+
+    def _run_poll(self):
+        while not self._cancel_event.wait(WATCH_POLL_SECONDS):
+            for d in list(self._mtimes):
+                if self._cancel_event.is_set():
+                    return
+                try:
+                    changed = os.stat(d).st_mtime_ns != self._mtimes.get(d)
+                except OSError:
+                    changed = True
+                if changed:
+                    self._rescan_dir(d)
+            self._flush()
+
+    def _run_inotify(self):
+        import select
+        import struct
+        header = struct.Struct('iIII')
+        dirty = set()
+        last_event = 0.0
+        try:
+            while not self._cancel_event.is_set():
+                ready, _, _ = select.select([self._fd], [], [], WATCH_DEBOUNCE_SECONDS / 2)
+                if ready:
+                    try:
+                        data = os.read(self._fd, 64 * 1024)
+                    except BlockingIOError:
+                        data = b''
+                    pos = 0
+                    while pos + header.size <= len(data):
+                        wd, mask, _cookie, length = header.unpack_from(data, pos)
+                        pos += header.size + length
+                        if mask & self.IN_Q_OVERFLOW:
+                            dirty.update(self._mtimes)  # events were lost: re-check everything
+                        elif wd in self._wd_to_dir:
+                            dirty.add(self._wd_to_dir[wd])
+                    last_event = time.monotonic()
+                    continue
+                if dirty and time.monotonic() - last_event >= WATCH_DEBOUNCE_SECONDS:
+                    for d in sorted(dirty):
+                        self._rescan_dir(d)
+                    dirty.clear()
+                    self._flush()
+        finally:
+            self._close_inotify()
+
+    def _close_inotify(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+        self._fd = None
+        self._wd_to_dir, self._dir_to_wd = {}, {}
+
+
+class MediaProber:
+    """Pool of worker threads that probes each file once in the background and
+    keeps the results in a shared store, mirrored into the catalog:
+    videos get duration_ms/width/height, images width/height/frames.
+    The playback path only looks values up with get().
+    """
+
+    STOP, URGENT, LOAD, BACKGROUND = range(4)  # queue priorities
+
+    def __init__(self, catalog=None, on_probed=None, workers=PROBE_WORKERS):
+        self.catalog = catalog if catalog is not None and catalog.available else None
+        self.on_probed = on_probed  # on_probed(path, meta), called on a worker thread
+        self._meta = {}
+        self._pending = set()
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._generation = 0
+        self._root = None
+        self._unsaved = 0
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(max(1, workers))]
+        for t in self._threads:
+            t.start()
+
+    def get(self, path):
+        return self._meta.get(path)
+
+    def reset(self, root, paths):
+        """Switch to a new file list: load what the catalog knows, probe the rest."""
+        self._generation += 1
+        self._root = root
+        self._meta = {}
+        self._pending = set()
+        self._put(self.LOAD, 'load', list(paths))
+
+    def request(self, paths, urgent=False):
+        for path in paths:
+            if path in self._meta or (path in self._pending and not urgent):
+                continue
+            self._pending.add(path)
+            self._put(self.URGENT if urgent else self.BACKGROUND, 'probe', path)
+
+    def close(self):
+        for _ in self._threads:
+            self._put(self.STOP, 'stop', None)
+
+    def _put(self, priority, kind, arg):
+        self._queue.put((priority, next(self._seq), self._generation, kind, arg))
+
+    def _work(self):
+        while True:
+            _prio, _seq, gen, kind, arg = self._queue.get()
+            if kind == 'stop':
+                return
+            if gen != self._generation:
+                continue  # left over from a previous folder
+            try:
+                if kind == 'load':
+                    self._load(gen, arg)
+                else:
+                    self._probe_one(gen, arg)
+            except Exception:
+                pass
+            if self.catalog and self._unsaved and self._queue.empty():
+                self._unsaved = 0
+                self.catalog.commit()
+
+    def _load(self, gen, paths):
+        known = self.catalog.metadata(self._root) if self.catalog and self._root else {}
+        if gen != self._generation:
+            return
+        self._meta.update(known)
+        self.request(p for p in paths if p not in known)
+
+    def _probe_one(self, gen, path):
+        self._pending.discard(path)
+        if path in self._meta:
+            return
+        if path.lower().endswith(VIDEO_EXTS):
+            meta = self._probe_video(path)
+        else:
+            meta = self._probe_image(path)
+        if meta is None or gen != self._generation:
+            return
+        self._meta[path] = meta
+        if self.catalog and self._root:
+            self.catalog.set_meta(self._root, path, meta)
+            self._unsaved += 1
+            if self._unsaved >= 100:
+                self._unsaved = 0
+                self.catalog.commit()
+        if self.on_probed:
+            self.on_probed(path, meta)
+
+    def _probe_image(self, path):
+        try:
+            with Image.open(path) as img:
+                # header only, except n_frames which walks an animation's frames
+                return {'width': img.width, 'height': img.height, 'frames': getattr(img, 'n_frames', 1)}
+        except Exception:
+            return {'error': True}
+
+    def _probe_video(self, path):
+        if get_vlc_instance() is None:
+            return None
+        media = None
+        try:
+            media = new_vlc_media(path)
+            media.parse_with_options(vlc.MediaParseFlag.local, int(PROBE_TIMEOUT_SECONDS * 1000))
+            deadline = time.monotonic() + PROBE_TIMEOUT_SECONDS
+            # 0 = not parsed yet; skipped/failed/timeout/done are all final
+            while int(media.get_parsed_status()) == 0 and time.monotonic() < deadline:
+                time.sleep(0.05)
+            meta = {'duration_ms': max(0, media.get_duration())}
+            for track in media.tracks_get() or ():
+                if track.type == vlc.TrackType.video:
+                    video = track.video.contents
+                    meta['width'], meta['height'] = video.width, video.height
+                    break
+            return meta
+        except Exception:
+            return {'error': True}
+        finally:
+            if media is not None:
+                try:
+                    media.release()
+                except Exception:
+                    pass
+
+
+class DiskImageCache:
+    """Persistent cache of display-size images and thumbnails under DISK_CACHE_DIR.
+    Entries are named by a hash of (path, mtime, file size, target size), so a
+    changed file simply misses. Images are encoded as WebP (JPEG/PNG if Pillow
+    lacks WebP) by a background writer, and the directory is trimmed back under
+    its byte budget by least recent use (a hit refreshes the entry's mtime).
+    """
+
+    def __init__(self, root=DISK_CACHE_DIR, budget_bytes=DISK_CACHE_BYTES):
+        self.root = root
+        self.budget_bytes = budget_bytes
+        self._webp = features.check('webp')
+        self._queue = queue.Queue(maxsize=32)
+        self._writes = 0
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def _entry_path(self, path, size):
+        stamp = ImageCache.stamp(path)
+        if stamp is None:
+            return None
+        key = f'{path}\0{stamp[0]}\0{stamp[1]}\0{size[0]}x{size[1]}'
+        digest = hashlib.sha1(key.encode('utf-8', 'surrogateescape')).hexdigest()
+        return os.path.join(self.root, digest[:2], digest)
+
+    def contains(self, path, size):
+        entry = self._entry_path(path, size)
+        return entry is not None and os.path.exists(entry)
+
+    def get(self, path, size):
+        entry = self._entry_path(path, size)
+        if entry is None:
+            return None
+        try:
+            with Image.open(entry) as img:
+                img.load()
+                result = ImageLoader._display_ready(img)
+            os.utime(entry)  # mark as recently used
+            return result
+        except (OSError, ValueError):
+            return None
+
+    def put(self, path, size, img):
+        """Queue an image for writing; dropped if the writer is backed up."""
+        entry = self._entry_path(path, size)
+        if entry is None:
+            return
+        try:
+            self._queue.put_nowait((entry, img))
+        except queue.Full:
+            pass
+
+    def close(self):
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def _write_loop(self):
+        self._trim()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            entry, img = item
+            tmp = entry + '.tmp'
+            try:
+                os.makedirs(os.path.dirname(entry), exist_ok=True)
+                if self._webp:
+                    img.save(tmp, 'WEBP', quality=90, method=4)
+                elif img.mode == 'RGBA':
+                    img.save(tmp, 'PNG')
+                else:
+                    img.save(tmp, 'JPEG', quality=90)
+                os.replace(tmp, entry)
+            except Exception:
+                continue
+            self._writes += 1
+            if self._writes % 200 == 0:
+                self._trim()
+
+    def _trim(self):
+        trim_cache_dir(self.root, self.budget_bytes)
+
+
+def trim_cache_dir(root, budget_bytes):
+    """Delete the least recently used files under root's two-level layout until it is
+    back under 90% of budget_bytes.
+    """
+    entries = []
+    total = 0
+    try:
+        for sub in os.scandir(root):
+            if not sub.is_dir():
+                continue
+            for e in os.scandir(sub.path):
+                st = e.stat()
+                entries.append((st.st_mtime, st.st_size, e.path))
+                total += st.st_size
+    except OSError:
+        return
+    if total <= budget_bytes:
+        return
+    entries.sort()
+    for _mtime, size, p in entries:
+        if total <= budget_bytes * 0.9:
+            break
+        try:
+            os.remove(p)
+            total -= size
+        except OSError:
+            pass
+
+
+def video_needs_proxy(width, height, duration_ms, file_bytes):
+    """Whether a video is heavy enough to be played from a proxy."""
+    if (width or 0) * (height or 0) > VIDEO_PROXY_MIN_PIXELS:
+        return True
+    # bits per millisecond = kbit/s
+    return bool(duration_ms) and file_bytes * 8 / duration_ms > VIDEO_PROXY_MIN_KBPS
+
+
+class VideoProxyCache:
+    """Display-resolution proxies of heavy videos under VIDEO_PROXY_DIR, named
+    like DiskImageCache entries so a changed file simply misses.
+
+    request() queues videos (urgent ones first); a worker thread checks them
+    against the prober's metadata (asking it to probe those it has not seen
+    and coming back to them) and transcodes the heavy ones, one at a time,
+    in a child process (`--transcode-proxy`) at the lowest CPU priority.
+    While set_busy(True) (a video is playing) no job starts, and a running
+    one is suspended, or dropped and queued again where the OS can't
+    suspend it. lookup() gives the proxy to play, if there is one. Inert
+    when enabled is False.
+    """
+
+    def __init__(self, prober, enabled=VIDEO_PROXIES, root=VIDEO_PROXY_DIR, budget_bytes=VIDEO_PROXY_BYTES):
+        self.prober = prober
+        self.enabled = enabled
+        self.root = root
+        self.budget_bytes = budget_bytes
+        self._cond = threading.Condition()
+        self._wanted = collections.deque()
+        self._queued = set()
+        self._skip = set()  # (path, stamp) that are light enough or failed this session
+        self._unprobed = set()  # waiting for the prober; looked at again every second
+        self._probe_asked = set()
+        self._busy = False
+        self._closed = False
+        self._thread = None
+        if enabled:
+            self._thread = threading.Thread(target=self._work, daemon=True)
+            self._thread.start()
+
+    def _entry_path(self, path):
+        stamp = ImageCache.stamp(path)
+        if stamp is None:
+            return None
+        key = f'{path}\0{stamp[0]}\0{stamp[1]}\0{VIDEO_PROXY_HEIGHT}p{VIDEO_PROXY_KBPS}'
+        digest = hashlib.sha1(key.encode('utf-8', 'surrogateescape')).hexdigest()
+        return os.path.join(self.root, digest[:2], digest + '.mp4')
+
+    def lookup(self, path):
+        """Proxy file to play instead of path, or None."""
+        if not self.enabled:
+            return None
+        entry = self._entry_path(path)
+        if entry is None or not os.path.exists(entry):
+            return None
+        try:
+            os.utime(entry)  # mark as recently used
+        except OSError:
+            pass
+        return entry
+
+    def reset(self, paths):
+        with self._cond:
+            self._wanted.clear()
+            self._queued.clear()
+            self._unprobed.clear()
+            self._probe_asked.clear()
+        self.request(paths)
+
+    def request(self, paths, urgent=False):
+        if not self.enabled:
+            return
+        paths = [p for p in paths if p.lower().endswith(VIDEO_EXTS)]
+        with self._cond:
+            if urgent:
+                for path in reversed(paths):
+                    if path in self._queued:
+                        self._wanted.remove(path)
+                    self._wanted.appendleft(path)
+            else:
+                self._wanted.extend(p for p in paths if p not in self._queued)
+            self._queued.update(paths)
+            self._cond.notify_all()
+
+    def set_busy(self, busy):
+        with self._cond:
+            self._busy = busy
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _work(self):
+        trim_cache_dir(self.root, self.budget_bytes)
+        while True:
+            with self._cond:
+                while (self._busy or not self._wanted) and not self._closed:
+                    if not self._busy and self._unprobed:
+                        self._cond.wait(1.0)
+                        self.request(self._unprobed)  # see whether their metadata is in yet
+                        self._unprobed = set()
+                    else:
+                        self._cond.wait()
+                if self._closed:
+                    return
+                path = self._wanted.popleft()
+                self._queued.discard(path)
+            try:
+                self._consider(path)
+            except Exception:
+                pass
+
+    def _consider(self, path):
+        entry = self._entry_path(path)
+        key = (path, ImageCache.stamp(path))
+        if entry is None or key in self._skip or os.path.exists(entry):
+            return
+        meta = self.prober.get(path)
+        if meta is None:
+            with self._cond:
+                self._unprobed.add(path)
+                if path not in self._probe_asked:
+                    self._probe_asked.add(path)
+                    self.prober.request([path], urgent=True)
+            return
+        if meta.get('error') or not video_needs_proxy(meta.get('width'), meta.get('height'),
+                                                      meta.get('duration_ms'), key[1][1]):
+            self._skip.add(key)
+            return
+        part = entry + '.part'
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        code = self._transcode(path, part)
+        if code == 0 and os.path.exists(part):
+            os.replace(part, entry)
+            trim_cache_dir(self.root, self.budget_bytes)
+        else:
+            if code is not None:  # None: interrupted, try again later
+                self._skip.add(key)
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+
+    def _transcode(self, path, part):
+        """Run the child to completion; its exit status, or None if interrupted."""
+        can_suspend = hasattr(signal, 'SIGSTOP')
+        proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--transcode-proxy', path, part],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                creationflags=getattr(subprocess, 'IDLE_PRIORITY_CLASS', 0))
+        suspended = False
+        active = 0.0
+        try:
+            while True:
+                try:
+                    return proc.wait(timeout=0.25)
+                except subprocess.TimeoutExpired:
+                    pass
+                if self._closed:
+                    return None
+                if self._busy != suspended:
+                    if not can_suspend:
+                        self.request([path])  # start over once playback is done
+                        return None
+                    proc.send_signal(signal.SIGSTOP if self._busy else signal.SIGCONT)
+                    suspended = self._busy
+                if not suspended:
+                    active += 0.25
+                    if active > VIDEO_PROXY_TIMEOUT_SECONDS:
+                        return 1
+        finally:
+            if proc.poll() is None:
+                try:
+                    proc.kill()  # also ends a stopped process
+                    proc.wait()
+                except OSError:
+                    pass
+
+
+class ImageTooLarge(Exception):
+    """An image whose decoded size exceeds every memory limit."""
+
+
+class PosterExtractor:
+    """Grabs a poster frame from a video with a libvlc instance of its own, set up
+    like the shared one (the active performance profile) but with no window and
+    no audio: its scene video filter writes the first frame it decodes (after
+    seeking to POSTER_POSITION) to a PNG in a scratch directory.
+
+    One video at a time, on the caller's (worker) thread. Playback requests go
+    first: a background one (grid thumbnails) waits while any are queued, and
+    one already running gives way and starts over once they are done.
+    close() never waits for a grab: the grab stops at its next poll and the
+    worker releases the instance.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._running = False
+        self._urgent_waiting = 0
+        self._closed = False
+        self._instance = None
+        self._dir = tempfile.mkdtemp(prefix='memeplayer-posters-')
+        self._file = os.path.join(self._dir, 'poster.png')
+
+    def _get_instance(self):
+        if self._instance is None:
+            get_vlc_instance()  # loads the active profile
+            self._instance = vlc.Instance(list(vlc_profile['instance']) + [
+                '--no-audio', '--vout=dummy', '--video-filter=scene', '--scene-format=png', '--scene-replace',
+                '--scene-ratio=1000000',  # only the first frame
+                '--scene-prefix=poster', '--scene-path=' + self._dir])
+        return self._instance
+
+    def extract(self, path, background=False):
+        """Full-size poster frame of the video at path; OSError if none could be taken."""
+        if not VLC_AVAILABLE:
+            raise OSError('no video backend for poster frames')
+        while True:
+            with self._cond:
+                if background:
+                    while (self._running or self._urgent_waiting) and not self._closed:
+                        self._cond.wait()
+                else:
+                    self._urgent_waiting += 1
+                    while self._running and not self._closed:
+                        self._cond.wait()
+                    self._urgent_waiting -= 1
+                if self._closed:
+                    raise OSError('poster extractor closed')
+                self._running = True
+            try:
+                frame = self._grab(path, background)
+            finally:
+                with self._cond:
+                    self._running = False
+                    self._cond.notify_all()
+                    if self._closed:
+                        self._release()
+            if frame is not None:
+                return frame
+
+    def _give_way(self, background):
+        return self._closed or (background and self._urgent_waiting > 0)
+
+    def _grab(self, path, background):
+        """The frame, or None when the grab gave way to a playback request or to close()."""
+        media = player = None
+        try:
+            instance = self._get_instance()
+            if os.path.exists(self._file):
+                os.remove(self._file)
+            media = instance.media_new(path, *vlc_profile['media'])
+            if POSTER_POSITION:
+                media.parse_with_options(vlc.MediaParseFlag.local, int(PROBE_TIMEOUT_SECONDS * 1000))
+                deadline = time.monotonic() + PROBE_TIMEOUT_SECONDS
+                while int(media.get_parsed_status()) == 0 and time.monotonic() < deadline:
+                    if self._give_way(background):
+                        return None
+                    time.sleep(0.05)
+                length_ms = max(0, media.get_duration())
+                if length_ms:
+                    media.add_option(f':start-time={length_ms * POSTER_POSITION / 1000:.3f}')
+            player = instance.media_player_new()
+            player.set_media(media)
+            player.play()
+            deadline = time.monotonic() + POSTER_TIMEOUT_SECONDS
+            while time.monotonic() < deadline:
+                if os.path.exists(self._file):
+                    try:
+                        with Image.open(self._file) as img:
+                            img.load()
+                            return img.copy()
+                    except (OSError, ValueError):
+                        pass  # still being written
+                if player.get_state() in (vlc.State.Error, vlc.State.Ended):
+                    break
+                if self._give_way(background):
+                    return None
+                time.sleep(0.02)
+            raise OSError('no poster frame for ' + os.path.basename(path))
+        except vlc.VLCException as e:
+            raise OSError(str(e))
+        finally:
+            if player is not None:
+                try:
+                    player.stop()
+                    player.release()
+                except Exception:
+                    pass
+            if media is not None:
+                try:
+                    media.release()
+                except Exception:
+                    pass
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            if not self._running:  # otherwise the running grab's worker does it
+                self._release()
+
+    def _release(self):
+        # called with _cond held, once no grab is running
+        try:
+            if self._instance is not None:
+                self._instance.release()
+        except Exception:
+            pass
+        self._instance = None
+        try:
+            if os.path.exists(self._file):
+                os.remove(self._file)
+            os.rmdir(self._dir)
+        except OSError:
+            pass
+
+
+class ImageLoader:
+    """Decodes an image file into a display-ready PIL image that fits `size`.
+    Used both on the Tk thread and by the prefetch workers.
+
+    With draft=True, JPEGs are decoded at the smallest DCT scale that is still
+    at least `size`, so most of a camera photo is never decoded at all; the
+    LANCZOS resize then finishes the job. draft=False decodes every pixel.
+    With a DiskImageCache, results are read from and written to disk first.
+
+    The decoded size is worked out from the header (after any draft) first.
+    Anything over `memory_limit` bytes is handed to a child process instead,
+    and anything over PROXY_MEMORY_LIMIT_BYTES raises ImageTooLarge.
+
+    Given a PosterExtractor, videos load as their poster frame; the frame is
+    stored in the disk cache at POSTER_SIZE and every other size comes from it.
+    A `background` loader's poster grabs give way to everyone else's.
+    """
+
+    def __init__(self, resample=Image.LANCZOS, draft=JPEG_DRAFT_DECODE, disk_cache=None,
+                 memory_limit=IMAGE_MEMORY_LIMIT_BYTES, posters=None, background=False):
+        self.resample = resample
+        self.draft = draft
+        self.disk_cache = disk_cache
+        self.memory_limit = memory_limit
+        self.posters = posters
+        self.background = background
+
+    def load(self, path, size):
+        if self.disk_cache is not None:
+            img = self.disk_cache.get(path, size)
+            if img is not None:
+                return img
+        img = self.decode(path, size)
+        if self.disk_cache is not None:
+            self.disk_cache.put(path, size, img)
+        return img
+
+    @staticmethod
+    def decoded_bytes(img):
+        """Memory the pixels of img take once loaded (it may be just opened, not yet loaded)."""
+        w, h = img.size
+        if img.mode in ('1', 'L', 'P'):
+            per_pixel = 1
+        elif img.mode.startswith('I;16'):
+            per_pixel = 2
+        else:
+            per_pixel = 4  # Pillow keeps RGB and every multi-band mode at 4 bytes a pixel
+        return w * h * per_pixel
+
+    def fits_in_memory(self, img):
+        return self.memory_limit is None or self.decoded_bytes(img) <= self.memory_limit
+
+    def decode(self, path, size):
+        if path.lower().endswith(VIDEO_EXTS):
+            return self._decode_poster(path, size)
+        with Image.open(path) as img:
+            if self.draft:
+                img.draft(None, size)  # no-op for formats without reduced decoding
+            if not self.fits_in_memory(img):
+                return self._decode_in_child(path, size, img)
+            # thumbnail would otherwise pick its own draft scale (2x the target)
+            img.thumbnail(size, self.resample, reducing_gap=None)
+            img.load()  # thumbnail leaves images that already fit unloaded
+            return self._display_ready(img)
+
+    def _decode_poster(self, path, size):
+        if self.posters is None:
+            raise OSError('no poster frames without a video backend')
+        frame = self.disk_cache.get(path, POSTER_SIZE) if self.disk_cache is not None else None
+        if frame is None:
+            frame = self.posters.extract(path, background=self.background)
+            frame.thumbnail(POSTER_SIZE, self.resample, reducing_gap=None)
+            frame = self._display_ready(frame)
+            if self.disk_cache is not None and size != POSTER_SIZE:
+                self.disk_cache.put(path, POSTER_SIZE, frame)
+        img = frame.copy()
+        img.thumbnail(size, self.resample, reducing_gap=None)
+        return img
+
+    def _decode_in_child(self, path, size, img):
+        need = self.decoded_bytes(img)
+        if need > PROXY_MEMORY_LIMIT_BYTES:
+            raise ImageTooLarge(f'{img.size[0]}x{img.size[1]} image needs {need // (1024 * 1024)} MB to decode')
+        # the memory spike happens in a process that exits straight after
+        fd, out = tempfile.mkstemp(suffix='.png')
+        os.close(fd)
+        try:
+            subprocess.run([sys.executable, os.path.abspath(__file__), '--shrink', path, str(size[0]),
+                            str(size[1]), out], check=True, timeout=PROXY_TIMEOUT_SECONDS,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            with Image.open(out) as shrunk:
+                shrunk.load()
+                return self._display_ready(shrunk)
+        except (OSError, subprocess.SubprocessError) as e:
+            raise ImageTooLarge(f'{img.size[0]}x{img.size[1]} image could not be shrunk: {e}')
+        finally:
+            try:
+                os.remove(out)
+            except OSError:
+                pass
+
+    def decodes_in_child(self, path, size):
+        """Whether load() would hand path to a child process, which can take up to
+        PROXY_TIMEOUT_SECONDS. Reads the header only.
+        """
+        if path.lower().endswith(VIDEO_EXTS):
+            return False
+        if self.disk_cache is not None and self.disk_cache.contains(path, size):
+            return False
+        with Image.open(path) as img:
+            if self.draft:
+                img.draft(None, size)
+            return not self.fits_in_memory(img)
+
+    def decodes_quickly(self, path, size):
+        """True when decode() is cheap enough for the Tk thread: disk cache hits and small sources."""
+        if self.disk_cache is not None and self.disk_cache.contains(path, size):
+            return True
+        try:
+            with Image.open(path) as img:
+                return img.size[0] * img.size[1] <= PREVIEW_MIN_PIXELS
+        except Exception:
+            return True  # decode() reports the error
+
+    def preview(self, path, size):
+        """Quick low-quality image of the size decode() would produce: a draft
+        decode at half the target (JPEG) and a bilinear resize. None when a
+        preview would not be faster: small sources, disk cache hits, and
+        formats or sizes where the draft decode would not reduce anything.
+        """
+        if self.decodes_quickly(path, size):
+            return None
+        with Image.open(path) as img:
+            w, h = img.size
+            scale = min(size[0] / w, size[1] / h, 1.0)
+            fit = (max(1, round(w * scale)), max(1, round(h * scale)))
+            if img.draft(None, (fit[0] // 2, fit[1] // 2)) is None:
+                return None  # a full decode: no quicker than decode() itself
+            if not self.fits_in_memory(img):
+                return None  # decode() takes the bounded route
+            return self._display_ready(img.resize(fit, Image.BILINEAR, reducing_gap=2.0))
+
+    def close(self):
+        if self.posters is not None:
+            self.posters.close()
+
+    @staticmethod
+    def _display_ready(img):
+        # RGB/RGBA converts to a PhotoImage without further work on the Tk thread
+        if img.mode in ('RGB', 'RGBA'):
+            return img
+        has_alpha = img.mode in ('LA', 'PA') or 'transparency' in img.info
+        return img.convert('RGBA' if has_alpha else 'RGB')
+
+
+def _decode_to_shared_memory(path, size, resample, draft, memory_limit):
+    """Worker-process side of ProcessImageLoader: decode into a new shared memory
+    block, left for the caller to map and unlink. Returns (name, mode, size).
+    """
+    img = ImageLoader(resample, draft, memory_limit=memory_limit).decode(path, size)
+    mode = 'RGBA' if img.mode == 'RGBA' else 'RGBX'  # 4-byte pixels map without conversion
+    data = img.tobytes('raw', mode)
+    shm = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        shm.buf[:len(data)] = data
+        return shm.name, mode, img.size
+    finally:
+        shm.close()
+
+
+class ProcessImageLoader(ImageLoader):
+    """ImageLoader whose decodes run in a pool of worker processes, so several
+    large images decode in parallel without holding the UI's interpreter.
+    Pixels come back in shared memory and are wrapped by Image.frombuffer
+    without a copy (mode RGBX or RGBA); the block is unmapped along with the
+    last image viewing it.
+    Previews, poster frames and disk cache reads stay in this process.
+    """
+
+    def __init__(self, workers=DECODE_PROCESSES, **kwargs):
+        super().__init__(**kwargs)
+        # spawn: forking a process that runs Tk and worker threads is not safe
+        self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=max(1, workers),
+                                                            mp_context=get_context('spawn'))
+
+    def decode(self, path, size):
+        if path.lower().endswith(VIDEO_EXTS):
+            return super().decode(path, size)  # libvlc does that work on its own threads
+        future = self._pool.submit(_decode_to_shared_memory, path, size, self.resample, self.draft,
+                                   self.memory_limit)
+        name, mode, img_size = future.result()
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            img = Image.frombuffer(mode, img_size, shm.buf, 'raw', mode, 0, 1)
+        except Exception:
+            shm.close()
+            raise
+        finally:
+            try:
+                shm.unlink()  # the mapping stays valid; nothing is left behind if we crash
+            except Exception:
+                pass
+        # the image views the mapping, so it keeps the block open until it is itself freed
+        img.shared_memory = shm
+        return img
+
+    def close(self):
+        super().close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ImageCache:
+    """LRU cache of display-ready images keyed by (path, file stamp, size),
+    bounded by a budget of decoded bytes rather than an entry count.
+    The stamp is the file's (mtime, size), so a changed file never hits and
+    its stale entries are dropped. Thread-safe.
+    """
+
+    def __init__(self, budget_bytes=IMAGE_CACHE_BYTES):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()  # key -> (image, nbytes)
+        self._keys_by_path = {}  # path -> set of keys
+
+    @staticmethod
+    def stamp(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def get(self, path, size, stamp=None):
+        stamp = stamp or self.stamp(path)
+        key = (path, stamp, size)
+        with self._lock:
+            self._drop_stale(path, stamp)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def load(self, path, size, loader):
+        """Cached image for path at size, decoding it through loader on a miss."""
+        stamp = self.stamp(path)
+        img = self.get(path, size, stamp)
+        if img is None:
+            img = loader.load(path, size)
+            self.put(path, size, img, stamp)
+        return img
+
+    def put(self, path, size, img, stamp):
+        nbytes = ImageLoader.decoded_bytes(img)
+        if stamp is None or nbytes > self.budget_bytes:
+            return
+        key = (path, stamp, size)
+        with self._lock:
+            self._drop_stale(path, stamp)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.used_bytes -= old[1]
+            self._entries[key] = (img, nbytes)
+            self._keys_by_path.setdefault(path, set()).add(key)
+            self.used_bytes += nbytes
+            while self.used_bytes > self.budget_bytes:
+                old_key, (_img, old_bytes) = self._entries.popitem(last=False)
+                self.used_bytes -= old_bytes
+                self._forget_key(old_key)
+
+    def _drop_stale(self, path, stamp):
+        for key in [k for k in self._keys_by_path.get(path, ()) if k[1] != stamp]:
+            self.used_bytes -= self._entries.pop(key)[1]
+            self._forget_key(key)
+
+    def _forget_key(self, key):
+        keys = self._keys_by_path.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_path[key[0]]
+
+
+class ReadAhead:
+    """Worker thread that warms the OS page cache for files about to be opened:
+    posix_fadvise(WILLNEED) where available, then a sequential read in chunks
+    of each file's first READAHEAD_FILE_BYTES.
+
+    warm() replaces the list (in play order) and cancels a read in progress
+    between chunks, so a jump elsewhere stops work on the old picks at once.
+    The list as a whole is read up to `budget_bytes`. Files read recently (and
+    unchanged) are skipped.
+    """
+
+    def __init__(self, budget_bytes=READAHEAD_BYTES, file_bytes=READAHEAD_FILE_BYTES,
+                 chunk_bytes=READAHEAD_CHUNK_BYTES):
+        self.budget_bytes = budget_bytes
+        self.file_bytes = file_bytes
+        self.chunk_bytes = chunk_bytes
+        self.bytes_read = 0
+        self._cond = threading.Condition()
+        self._paths = []
+        self._generation = 0
+        self._closed = False
+        self._warmed = collections.OrderedDict()  # (path, stamp) read lately, oldest first
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def warm(self, paths):
+        paths = list(paths)
+        with self._cond:
+            if paths == self._paths:
+                return
+            self._generation += 1
+            self._paths = paths
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._generation += 1
+            self._cond.notify_all()
+
+    def _current(self, gen):
+        return gen == self._generation and not self._closed
+
+    def _work(self):
+        buf = bytearray(self.chunk_bytes)
+        seen = -1
+        while True:
+            with self._cond:
+                while self._generation == seen and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                gen = seen = self._generation
+                paths = self._paths
+            budget = self.budget_bytes
+            for path in paths:
+                if budget <= 0 or not self._current(gen):
+                    break
+                try:
+                    budget -= self._read(path, min(budget, self.file_bytes), gen, buf)
+                except OSError:
+                    pass
+
+    def _read(self, path, limit, gen, buf):
+        stamp = ImageCache.stamp(path)
+        key = (path, stamp)
+        if stamp is None or key in self._warmed:
+            return 0
+        want = min(stamp[1], limit)
+        total = 0
+        view = memoryview(buf)
+        with open(path, 'rb', buffering=0) as f:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(f.fileno(), 0, want, os.POSIX_FADV_WILLNEED)
+            while total < want:
+                if not self._current(gen):
+                    self.bytes_read += total
+                    return total  # cancelled: not marked as warm
+                n = f.readinto(view[:min(len(buf), want - total)])
+                if not n:
+                    break
+                total += n
+        self.bytes_read += total
+        self._warmed[key] = True
+        while len(self._warmed) > 256:
+            self._warmed.popitem(last=False)
+        return total
+
+
+class ImagePrefetcher:
+    """Decodes and resizes the next few images on worker threads into the
+    shared ImageCache, so a transition only has to swap in a prepared image.
+
+    prefetch() replaces the wanted list (in priority order). take() returns
+    the cached image, waiting for it if a worker is already on it, and counts
+    hits and misses. on_ready(path, size, ok), if given, is called on the
+    worker after each decode.
+    """
+
+    def __init__(self, loader, cache, workers=PREFETCH_WORKERS, on_ready=None):
+        self.loader = loader
+        self.cache = cache
+        self.on_ready = on_ready
+        self.hits = 0
+        self.misses = 0
+        self._cond = threading.Condition()
+        self._wanted = []  # (path, size) keys, most urgent first
+        self._done = set()  # wanted keys already in the cache
+        self._inflight = {}  # key -> Event set when its decode finishes
+        self._closed = False
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(max(1, workers))]
+        for t in self._threads:
+            t.start()
+
+    def prefetch(self, paths, size):
+        with self._cond:
+            self._wanted = [(p, size) for p in paths]
+            self._done = set()
+            self._cond.notify_all()
+
+    def take(self, path, size, timeout=None):
+        """Prepared image for path at size, or None on a miss (caller decodes itself).
+        A decode already running is waited for, up to `timeout` seconds.
+        """
+        key = (path, size)
+        with self._cond:
+            pending = self._inflight.get(key)
+            if pending is None and key in self._wanted:
+                self._wanted.remove(key)  # not started yet: the caller handles it now
+        if pending is not None:
+            pending.wait(timeout)
+        img = self.cache.get(path, size)
+        if img is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return img
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _next_job(self):
+        for key in self._wanted:
+            if key not in self._done and key not in self._inflight:
+                return key
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                key = self._next_job()
+                while key is None and not self._closed:
+                    self._cond.wait()
+                    key = self._next_job()
+                if self._closed:
+                    return
+                done = self._inflight[key] = threading.Event()
+            ok = False
+            try:
+                self.cache.load(key[0], key[1], self.loader)
+                ok = True
+            except Exception:
+                pass
+            with self._cond:
+                del self._inflight[key]
+                self._done.add(key)
+            done.set()
+            if self.on_ready is not None:
+                self.on_ready(key[0], key[1], ok)
+
+
+class AnimationDecoder:
+    """Plays back an animated GIF/WebP from a worker thread that decodes and
+    resizes one frame at a time into a small ring of display-ready frames, so
+    memory stays bounded however long the animation is. The Tk side pulls
+    frames with next_frame() and paces them itself (see `deadline`).
+    `finished` turns true once no more frames will come (not animated,
+    decode error, or stopped).
+    """
+
+    def __init__(self, path, size, resample=Image.LANCZOS, depth=ANIM_BUFFER_FRAMES):
+        self.path = path
+        self.size = size
+        self.resample = resample
+        self.frames = queue.Queue(maxsize=max(1, depth))  # (image, duration in seconds)
+        self.finished = False
+        self.deadline = None  # monotonic time the next frame is due, kept by the consumer
+        self.dropped = 0
+        self.photo = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def next_frame(self):
+        try:
+            return self.frames.get_nowait()
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        try:
+            with Image.open(self.path) as img:
+                if not getattr(img, 'is_animated', False):
+                    return
+                if ImageLoader.decoded_bytes(img) > IMAGE_MEMORY_LIMIT_BYTES:
+                    return  # the still first frame stays on screen
+                # one mode and size for every frame, so the consumer can paste into one PhotoImage
+                mode = 'RGBA' if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info else 'RGB'
+                fit = img.size
+                scale = min(self.size[0] / fit[0], self.size[1] / fit[1])
+                if scale < 1:
+                    fit = (max(1, round(fit[0] * scale)), max(1, round(fit[1] * scale)))
+                index = 0
+                while not self._stop.is_set():
+                    try:
+                        img.seek(index)
+                    except EOFError:
+                        if index == 0:
+                            return
+                        index = 0  # loop
+                        continue
+                    frame = img.convert(mode)
+                    if frame.size != fit:
+                        frame = frame.resize(fit, self.resample)
+                    duration = img.info.get('duration') or 0
+                    if duration < ANIM_MIN_FRAME_MS:
+                        duration = ANIM_DEFAULT_FRAME_MS  # what browsers do with 0/10 ms delays
+                    if not self._put((frame, duration / 1000.0)):
+                        return
+                    index += 1
+        except Exception:
+            pass
+        finally:
+            self.finished = True
+
+    def _put(self, item):
+        # block while the ring is full, but notice stop() promptly
+        while not self._stop.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+
+class TransitionRenderer:
+    """Renders the in-between frames of an image-to-image transition on a
+    worker thread. Both images are centred on a black panel-sized background
+    and blended with NumPy ('crossfade') or shifted ('slide').
+
+    Frame k of `count` shows the transition at k/count. The consumer sets
+    `due` to the frame it is about to show and the worker skips straight to
+    it, so on a slow machine frames are dropped rather than the transition
+    running long. At most `depth` frames wait in `frames`.
+    """
+
+    def __init__(self, old, new, size, kind='crossfade', count=10, depth=3):
+        self.kind = kind
+        self.count = max(2, count)
+        self.frames = queue.Queue(maxsize=max(1, depth))  # (k, image)
+        self.due = 1
+        self.dropped = 0
+        self.started = time.monotonic()
+        self.final = None  # PhotoImage to show once the transition is over
+        self.pending = None  # frame taken from the queue ahead of its slot
+        self.buffers = [None, None]  # front/back PhotoImages, kept by the consumer
+        self.back = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(old, new, size), daemon=True)
+        self._thread.start()
+
+    def next_frame(self):
+        try:
+            return self.frames.get_nowait()
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        self._stop.set()
+
+    @staticmethod
+    def _on_panel(img, size):
+        panel = Image.new('RGB', size, 'black')
+        box = ((size[0] - img.width) // 2, (size[1] - img.height) // 2)
+        panel.paste(img, box, img if img.mode == 'RGBA' else None)
+        return np.asarray(panel)
+
+    def _run(self, old, new, size):
+        try:
+            a = self._on_panel(old, size)
+            b = self._on_panel(new, size)
+            if self.kind == 'crossfade':
+                a = a.astype(np.int16)
+                diff = b.astype(np.int16) - a
+            k = 0
+            while not self._stop.is_set():
+                k = max(k + 1, self.due)
+                if k >= self.count:
+                    return  # the last frame is the incoming image itself
+                t = k / self.count
+                t = t * t * (3 - 2 * t)  # ease in and out
+                if self.kind == 'slide':
+                    off = int(round(size[0] * t))
+                    frame = np.concatenate((a[:, off:], b[:, :off]), axis=1)
+                else:
+                    frame = (a + ((diff * int(t * 256)) >> 8)).astype(np.uint8)
+                if not self._put((k, Image.fromarray(frame, 'RGB'))):
+                    return
+        except Exception:
+            pass
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self.frames.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+
+class SearchIndex:
+    """Live-search index owned by a worker thread.
+
+    A file matches when the query occurs in its normalized relative path.
+    File names are indexed by trigram; directories (far fewer) are matched by
+    a plain scan. Updates and queries are processed in order on the worker, so
+    a query always sees the changes issued before it. A query that extends the
+    previous one only re-checks the previous results, and a query superseded
+    by a newer one is abandoned part-way.
+    """
+
+    def __init__(self):
+        self._ops = queue.Queue()
+        self._latest_query = 0
+        self._reset_state(None)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def normalize(text):
+        return unicodedata.normalize('NFKC', text).casefold().replace(os.sep, '/').replace('\\', '/')
+
+    @classmethod
+    def key(cls, root, path):
+        """Normalized relative path of a file, the text queries are matched against."""
+        if root and path.startswith(root) and path[len(root):len(root) + 1] in (os.sep, '/'):
+            rel = path[len(root) + 1:]
+        elif root:
+            try:
+                rel = os.path.relpath(path, root)
+            except ValueError:
+                rel = path  # e.g. a different drive on Windows
+        else:
+            rel = path
+        return cls.normalize(rel)
+
+    # ----- called from the UI thread -----
+    def reset(self, root, paths):
+        self._ops.put(('reset', (root, list(paths))))
+
+    def add(self, paths, appended=True):
+        """Index new files. appended=False means they were inserted mid-list (watcher)."""
+        self._ops.put(('add', (list(paths), appended)))
+
+    def remove(self, paths):
+        self._ops.put(('remove', (list(paths),)))
+
+    def query(self, text, on_result):
+        """Match text asynchronously; on_result(paths) gets the matches in list order.
+        Any query still pending or running is abandoned.
+        """
+        self._latest_query += 1
+        self._ops.put(('query', (self._latest_query, text, on_result)))
+
+    def cancel_queries(self):
+        self._latest_query += 1
+
+    def close(self):
+        self._ops.put(None)
+
+    # ----- worker -----
+    def _run(self):
+        while True:
+            item = self._ops.get()
+            if item is None:
+                return
+            op, args = item
+            try:
+                getattr(self, '_do_' + op)(*args)
+            except Exception:
+                pass
+
+    def _reset_state(self, root):
+        self.root = root
+        self._ids = {}  # path -> file id
+        self._paths = []  # file id -> path (None once removed)
+        self._names = []  # file id -> normalized file name
+        self._dir_of = []  # file id -> dir id
+        self._dirs = {}  # normalized dir -> dir id
+        self._dir_keys = []  # dir id -> normalized dir ('' for the root itself)
+        self._dir_files = []  # dir id -> set of file ids
+        self._grams = {}  # trigram -> array of file ids (removed ids are skipped when matching)
+        self._late = set()  # file ids inserted mid-list, which sort after their neighbours' ids
+        self._removed = 0
+        self._version = 0
+        self._last = None  # (query, version, results) for narrowing
+
+    def _do_reset(self, root, paths):
+        self._reset_state(root)
+        self._do_add(paths, True)
+
+    def _do_add(self, paths, appended):
+        for path in paths:
+            if path in self._ids:
+                continue
+            dkey, _, name = self.key(self.root, path).rpartition('/')
+            did = self._dirs.get(dkey)
+            if did is None:
+                did = self._dirs[dkey] = len(self._dir_keys)
+                self._dir_keys.append(dkey)
+                self._dir_files.append(set())
+            fid = len(self._paths)
+            self._ids[path] = fid
+            self._paths.append(path)
+            self._names.append(name)
+            self._dir_of.append(did)
+            self._dir_files[did].add(fid)
+            for gram in {name[i:i + 3] for i in range(len(name) - 2)}:
+                posting = self._grams.get(gram)
+                if posting is None:
+                    posting = self._grams[gram] = array('I')
+                posting.append(fid)
+            if not appended:
+                self._late.add(fid)
+        self._version += 1
+
+    def _do_remove(self, paths):
+        for path in paths:
+            fid = self._ids.pop(path, None)
+            if fid is None:
+                continue
+            self._paths[fid] = None
+            self._names[fid] = None
+            self._dir_files[self._dir_of[fid]].discard(fid)
+            self._late.discard(fid)
+            self._removed += 1
+        self._version += 1
+        if self._removed > 1000 and self._removed > len(self._ids):
+            # mostly tombstones: rebuild compactly, keeping list order
+            self._do_reset(self.root, self._ordered(self._ids.values()))
+
+    def _full_key(self, fid):
+        dkey = self._dir_keys[self._dir_of[fid]]
+        return dkey + '/' + self._names[fid] if dkey else self._names[fid]
+
+    def _stale(self, gen):
+        return gen != self._latest_query
+
+    def _do_query(self, gen, text, on_result):
+        if self._stale(gen):
+            return
+        q = self.normalize(text.strip())
+        last = self._last
+        if (last is not None and last[1] == self._version and q.startswith(last[0])
+                and len(last[2]) <= self._candidate_count(q)):
+            # the query only got longer: narrow the previous results
+            prev = last[2]
+            result = []
+            for start in range(0, len(prev), 8192):
+                if self._stale(gen):
+                    return
+                for path in prev[start:start + 8192]:
+                    fid = self._ids.get(path)
+                    if fid is not None and q in self._full_key(fid):
+                        result.append(path)
+        else:
+            ids = self._match(q, gen)
+            if ids is None:
+                return
+            result = self._ordered(ids)
+        self._last = (q, self._version, result)
+        if not self._stale(gen):
+            on_result(result)
+
+    def _candidate_count(self, q):
+        """Rough cost of a fresh lookup, to decide whether narrowing is cheaper."""
+        if '/' in q or len(q) < 3:
+            return len(self._ids)
+        return min(len(self._grams.get(q[i:i + 3], ())) for i in range(len(q) - 2))
+
+    def _match(self, q, gen):
+        """Set of matching file ids, or None if the query went stale."""
+        if not q:
+            return set(self._ids.values())
+        ids = set()
+        for did, dkey in enumerate(self._dir_keys):
+            if dkey and q in dkey:
+                ids.update(self._dir_files[did])
+        if '/' in q:
+            # spans a directory boundary: dir must end with the head, name start with the tail
+            head, _, tail = q.rpartition('/')
+            head += '/'
+            for did, dkey in enumerate(self._dir_keys):
+                if dkey and (dkey + '/').endswith(head):
+                    ids.update(f for f in self._dir_files[did] if self._names[f].startswith(tail))
+            return ids
+        if len(q) >= 3:
+            postings = [self._grams.get(q[i:i + 3]) for i in range(len(q) - 2)]
+            if any(p is None for p in postings):
+                return ids
+            candidates = min(postings, key=len)
+        else:
+            candidates = range(len(self._names))
+        names = self._names
+        for start in range(0, len(candidates), 8192):
+            if self._stale(gen):
+                return None
+            ids.update(fid for fid in candidates[start:start + 8192]
+                       if names[fid] is not None and q in names[fid])
+        return ids
+
+    def _ordered(self, ids):
+        """Paths for ids in list order: ids grow with list position except watcher inserts."""
+        late = self._late.intersection(ids) if self._late else ()
+        result = [self._paths[fid] for fid in sorted(ids) if fid not in late]
+        for fid in late:
+            path = self._paths[fid]
+            bisect.insort(result, path, key=lambda p: FolderScanner.sort_key(self.root, p))
+        return result
+
+
+class VirtualView(ttk.Frame):
+    """Base of VirtualListbox and ThumbnailGrid: a canvas that only draws the
+    rows in view over a backing sequence kept by reference (not copied), with
+    tk.Listbox-style selection, see() and keyboard/mouse navigation.
+
+    After mutating the sequence call items_inserted()/items_deleted(), or
+    set_items() for a different list. Subclasses set _row_height, lay items
+    out _columns() to a row and draw in _redraw(). <<ListboxSelect>> fires on
+    the canvas, where bind() puts callers' bindings.
+    """
+
+    wheel_rows = 3  # rows scrolled per mouse wheel step
+
+    def __init__(self, master, selectmode='browse', formatter=str):
+        super().__init__(master)
+        # borrow the platform's listbox look
+        probe = tk.Listbox(self)
+        self._colors = {k: probe.cget(k) for k in ('background', 'foreground', 'selectbackground',
+                                                    'selectforeground')}
+        self._font = tkfont.Font(font=probe.cget('font'))
+        probe.destroy()
+        self.formatter = formatter
+        self.selectmode = selectmode
+        self._items = []
+        self._top_row = 0
+        self._selection = set()
+        self._anchor = None
+        self._row_height = self._font.metrics('linespace') + 2
+        self._redraw_pending = False
+
+        self.canvas = tk.Canvas(self, bg=self._colors['background'], highlightthickness=1, borderwidth=0,
+                                takefocus=1)
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self._on_scrollbar)
+        self.scrollbar.pack(side='right', fill='y')
+        self.canvas.pack(side='left', fill='both', expand=True)
+
+        c = self.canvas
+        c.bind('<Configure>', lambda e: self.refresh())
+        c.bind('<Button-1>', self._on_click)
+        c.bind('<Shift-Button-1>', self._on_shift_click)
+        c.bind('<Control-Button-1>', self._on_control_click)
+        c.bind('<MouseWheel>', lambda e: self._scroll_rows(-self.wheel_rows if e.delta > 0 else self.wheel_rows))
+        c.bind('<Button-4>', lambda e: self._scroll_rows(-self.wheel_rows))
+        c.bind('<Button-5>', lambda e: self._scroll_rows(self.wheel_rows))
+        c.bind('<Up>', lambda e: self._move_active(-self._columns()))
+        c.bind('<Down>', lambda e: self._move_active(self._columns()))
+        c.bind('<Shift-Up>', lambda e: self._move_active(-self._columns(), extend=True))
+        c.bind('<Shift-Down>', lambda e: self._move_active(self._columns(), extend=True))
+        c.bind('<Prior>', lambda e: self._move_active(-self._columns() * self._page_rows()))
+        c.bind('<Next>', lambda e: self._move_active(self._columns() * self._page_rows()))
+        c.bind('<Home>', lambda e: self._move_active(-len(self._items)))
+        c.bind('<End>', lambda e: self._move_active(len(self._items)))
+        c.bind('<Control-a>', lambda e: self._select_all())
+
+    def bind(self, sequence=None, func=None, add=None):
+        # clicks and keys land on the canvas, so that is where callers' bindings belong
+        return self.canvas.bind(sequence, func, add)
+
+    # ----- Listbox-compatible API -----
+    def size(self):
+        return len(self._items)
+
+    def get(self, index):
+        return self.formatter(self._items[self._index(index)])
+
+    def curselection(self):
+        return tuple(sorted(self._selection))
+
+    def selection_includes(self, index):
+        return self._index(index) in self._selection
+
+    def selection_clear(self, first, last=None):
+        first = self._index(first)
+        last = first if last is None else self._index(last)
+        if first == 0 and last >= len(self._items) - 1:
+            self._selection.clear()
+        else:
+            self._selection.difference_update(range(first, last + 1))
+        self.refresh()
+
+    def selection_set(self, first, last=None):
+        first = self._index(first)
+        last = first if last is None else self._index(last)
+        self._selection.update(i for i in range(first, last + 1) if 0 <= i < len(self._items))
+        self._anchor = first
+        self.refresh()
+
+    def see(self, index):
+        row = self._index(index) // self._columns()
+        page = self._page_rows()
+        if row < self._top_row:
+            self._top_row = row
+        elif row >= self._top_row + page:
+            self._top_row = row - page + 1
+        self.refresh()
+
+    # ----- backing sequence -----
+    def set_items(self, items):
+        """Show a new backing sequence (kept by reference) and reset the view."""
+        self._items = items
+        self._top_row = 0
+        self._selection.clear()
+        self._anchor = None
+        self.refresh()
+
+    def items_inserted(self, index, count=1):
+        """The backing sequence gained `count` items at `index`."""
+        self._selection = {i + count if i >= index else i for i in self._selection}
+        if self._anchor is not None and self._anchor >= index:
+            self._anchor += count
+        cols = self._columns()
+        if index < self._top_row * cols:
+            self._top_row += count // cols  # keep the rows in view where they are
+        self.refresh()
+
+    def items_deleted(self, index, count=1):
+        """The backing sequence lost `count` items starting at `index`."""
+        end = index + count
+        self._selection = {i - count if i >= end else i for i in self._selection if not index <= i < end}
+        if self._anchor is not None and self._anchor >= index:
+            self._anchor = max(index, self._anchor - count)
+        cols = self._columns()
+        if index < self._top_row * cols:
+            self._top_row -= min(count // cols, self._top_row - index // cols)
+        self.refresh()
+
+    def refresh(self):
+        """Schedule a redraw; any number of calls in one Tk tick cost one redraw."""
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self._redraw)
+
+    # ----- layout -----
+    def _index(self, index):
+        if index == 'end':
+            return len(self._items) - 1
+        return int(index)
+
+    def _columns(self):
+        return 1
+
+    def _page_rows(self):
+        return max(1, self.canvas.winfo_height() // self._row_height)
+
+    def _total_rows(self):
+        cols = self._columns()
+        return (len(self._items) + cols - 1) // cols
+
+    def _clamp_top(self):
+        """Keep the view inside the list; returns (total rows, rows per page)."""
+        total, page = self._total_rows(), self._page_rows()
+        self._top_row = max(0, min(self._top_row, total - page))
+        return total, page
+
+    def _update_scrollbar(self, total, page):
+        if total:
+            self.scrollbar.set(self._top_row / total, min(1.0, (self._top_row + page) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _redraw(self):
+        raise NotImplementedError
+
+    def _event_index(self, event):
+        raise NotImplementedError
+
+    # ----- interaction -----
+    def _on_scrollbar(self, action, *args):
+        if action == 'moveto':
+            self._top_row = int(float(args[0]) * self._total_rows())
+            self.refresh()
+        elif action == 'scroll':
+            self._scroll_rows(int(args[0]) * (self._page_rows() if args[1] == 'pages' else 1))
+
+    def _scroll_rows(self, rows):
+        self._top_row += rows
+        self.refresh()
+
+    def _changed_selection(self):
+        self.refresh()
+        self.canvas.event_generate('<<ListboxSelect>>')
+
+    def _select_only(self, index):
+        self._selection = {index}
+        self._anchor = index
+        self._changed_selection()
+
+    def _select_range(self, index):
+        anchor = self._anchor if self._anchor is not None else index
+        self._selection = set(range(min(anchor, index), max(anchor, index) + 1))
+        self._changed_selection()
+
+    def _on_click(self, event):
+        self.canvas.focus_set()
+        index = self._event_index(event)
+        if index >= 0:
+            self._select_only(index)
+
+    def _on_shift_click(self, event):
+        index = self._event_index(event)
+        if index < 0:
+            return
+        if self.selectmode == 'extended':
+            self._select_range(index)
+        else:
+            self._select_only(index)
+
+    def _on_control_click(self, event):
+        index = self._event_index(event)
+        if index < 0:
+            return
+        if self.selectmode != 'extended':
+            self._select_only(index)
+            return
+        self._selection.symmetric_difference_update({index})
+        self._anchor = index
+        self._changed_selection()
+
+    def _move_active(self, delta, extend=False):
+        if not self._items:
+            return 'break'
+        current = max(self._selection) if delta > 0 and self._selection else (
+            min(self._selection) if self._selection else -1)
+        index = max(0, min(len(self._items) - 1, current + delta))
+        if extend and self.selectmode == 'extended':
+            self._select_range(index)
+        else:
+            self._select_only(index)
+        self.see(index)
+        return 'break'
+
+    def _select_all(self):
+        if self.selectmode == 'extended' and self._items:
+            self._selection = set(range(len(self._items)))
+            self._changed_selection()
+        return 'break'
+
+
+class VirtualListbox(VirtualView):
+    """Listbox replacement that only renders the rows currently in view, so
+    redraw cost stays constant however many items the list holds.
+
+    Labels are produced by `formatter` for visible rows only. Selection,
+    see(), curselection() and keyboard/mouse navigation follow tk.Listbox
+    (including selectmode='extended').
+    """
+
+    def __init__(self, master, width=36, selectmode='browse', formatter=str):
+        super().__init__(master, selectmode=selectmode, formatter=formatter)
+        self.canvas.configure(width=width * self._font.measure('0'))
+        self._rows = []  # pooled (rect_id, text_id) canvas items, one per visible row
+        self.canvas.bind('<B1-Motion>', self._on_drag)
+
+    def nearest(self, y):
+        if not self._items:
+            return -1
+        return max(0, min(len(self._items) - 1, self._top_row + int(y) // self._row_height))
+
+    def _event_index(self, event):
+        return self.nearest(event.y)
+
+    def _redraw(self):
+        self._redraw_pending = False
+        c = self.canvas
+        n = len(self._items)
+        total, page = self._clamp_top()
+        width = c.winfo_width()
+        pool = page + 1  # plus a partially visible last row
+        while len(self._rows) < pool:
+            self._rows.append((c.create_rectangle(0, 0, 0, 0, width=0),
+                               c.create_text(0, 0, anchor='nw', font=self._font)))
+        for i, (rect, text) in enumerate(self._rows):
+            idx = self._top_row + i
+            if i >= pool or idx >= n:
+                c.itemconfigure(rect, state='hidden')
+                c.itemconfigure(text, state='hidden')
+                continue
+            y = i * self._row_height
+            selected = idx in self._selection
+            c.coords(rect, 0, y, width, y + self._row_height)
+            c.itemconfigure(rect, state='normal', fill=self._colors['selectbackground'] if selected else '')
+            c.coords(text, 3, y + 1)
+            c.itemconfigure(text, state='normal', text=self.formatter(self._items[idx]),
+                            fill=self._colors['selectforeground' if selected else 'foreground'])
+        self._update_scrollbar(total, page)
+
+    def _on_drag(self, event):
+        if event.y < 0:
+            self._scroll_rows(-1)
+        elif event.y > self.canvas.winfo_height():
+            self._scroll_rows(1)
+        index = self.nearest(event.y)
+        if index < 0:
+            return
+        if self.selectmode == 'extended':
+            self._select_range(index)
+        else:
+            self._select_only(index)
+
+
+class ThumbnailGrid(VirtualView):
+    """Scrolling grid of thumbnails over a shared backing sequence of paths,
+    rendering only the cells in view.
+
+    Thumbnails come from `thumbnailer` (an ImagePrefetcher filling `cache`);
+    videos get their poster frame when the loader can make one. Every redraw
+    replaces its wanted list with the visible cells still missing, so work
+    for cells scrolled out of view is dropped before it starts. Call
+    thumbnail_ready() on the Tk thread when one finishes.
+    """
+
+    wheel_rows = 1
+
+    def __init__(self, master, thumbnailer, cache, thumb_size=THUMB_SIZE, formatter=os.path.basename):
+        super().__init__(master, selectmode='extended', formatter=formatter)
+        self._char_w = max(1, self._font.measure('0'))
+        self.thumbnailer = thumbnailer
+        self.cache = cache
+        self.thumb_size = thumb_size
+        self._cell_w = thumb_size[0] + 16
+        self._row_height = thumb_size[1] + self._font.metrics('linespace') + 14
+        self._cells = []  # pooled (rect_id, image_id, text_id) canvas items, one per visible cell
+        self._photos = {}  # path -> PhotoImage, for visible cells only
+        self._pending = set()  # visible items whose thumbnail is being generated
+        self._failed = set()  # paths that could not be thumbnailed
+        self._wanted = []
+        self.canvas.bind('<Left>', lambda e: self._move_active(-1))
+        self.canvas.bind('<Right>', lambda e: self._move_active(1))
+
+    def nearest(self, x, y):
+        if not self._items:
+            return -1
+        col = min(self._columns() - 1, max(0, int(x) // self._cell_w))
+        row = self._top_row + max(0, int(y) // self._row_height)
+        return min(len(self._items) - 1, row * self._columns() + col)
+
+    def thumbnail_ready(self, path, ok):
+        """A thumbnail finished (ok=False: it could not be generated)."""
+        if not ok:
+            self._failed.add(path)
+        if path in self._pending:
+            self._pending.discard(path)
+            self.refresh()
+
+    def close(self):
+        self.thumbnailer.prefetch([], self.thumb_size)
+        self._photos.clear()
+
+    # ----- rendering -----
+    def _columns(self):
+        return max(1, self.canvas.winfo_width() // self._cell_w)
+
+    def _event_index(self, event):
+        return self.nearest(event.x, event.y)
+
+    def _thumbnail(self, path):
+        """PhotoImage for a visible cell, or None while it is missing (and then requested)."""
+        photo = self._photos.get(path)
+        if photo is not None or path in self._failed or not path.lower().endswith(PLAYABLE_EXTS):
+            return photo
+        if path not in self._pending:
+            img = self.cache.get(path, self.thumb_size)
+            if img is not None:
+                photo = self._photos[path] = ImageTk.PhotoImage(img)
+                return photo
+            self._pending.add(path)
+        return None
+
+    def _label(self, path):
+        text = self.formatter(path)
+        if not path.lower().endswith(IMAGE_EXTS):
+            text = '▶ ' + text
+        limit = max(4, (self._cell_w - 8) // self._char_w)
+        return text if len(text) <= limit else '…' + text[-(limit - 1):]
+
+    def _redraw(self):
+        self._redraw_pending = False
+        c = self.canvas
+        n = len(self._items)
+        cols = self._columns()
+        total, page = self._clamp_top()
+        first = self._top_row * cols
+        count = (page + 1) * cols  # plus a partially visible last row
+        while len(self._cells) < count:
+            self._cells.append((c.create_rectangle(0, 0, 0, 0, width=0),
+                                c.create_image(0, 0, anchor='center'),
+                                c.create_text(0, 0, anchor='n', font=self._font)))
+        th = self.thumb_size[1]
+        visible = set()
+        for i, (rect, image, text) in enumerate(self._cells):
+            idx = first + i
+            if i >= count or idx >= n:
+                for item in (rect, image, text):
+                    c.itemconfigure(item, state='hidden')
+                continue
+            path = self._items[idx]
+            visible.add(path)
+            row, col = divmod(i, cols)
+            x, y = col * self._cell_w, row * self._row_height
+            selected = idx in self._selection
+            c.coords(rect, x + 2, y + 2, x + self._cell_w - 2, y + self._row_height - 2)
+            c.itemconfigure(rect, state='normal', fill=self._colors['selectbackground'] if selected else '')
+            photo = self._thumbnail(path)
+            if photo is not None:
+                c.coords(image, x + self._cell_w // 2, y + 6 + th // 2)
+                c.itemconfigure(image, state='normal', image=photo)
+            else:
+                c.itemconfigure(image, state='hidden', image='')
+            c.coords(text, x + self._cell_w // 2, y + th + 10)
+            c.itemconfigure(text, state='normal', text=self._label(path),
+                            fill=self._colors['selectforeground' if selected else 'foreground'])
+        # off-screen cells give up their thumbnails and any work not yet started
+        for path in [p for p in self._photos if p not in visible]:
+            del self._photos[path]
+        self._pending.intersection_update(visible)
+        wanted = [p for p in self._items[first:first + count] if p in self._pending]
+        if wanted != self._wanted:
+            self._wanted = wanted
+            self.thumbnailer.prefetch(wanted, self.thumb_size)
+        self._update_scrollbar(total, page)
 
 
 class MemePlayer(tk.Tk):
@@ -209,20 +2894,82 @@ class MemePlayer(tk.Tk):
         self.files = []
         self.filtered_files = []  # after search filter
         self.current_index = None
+        self._scanner = None  # active FolderScanner, if a scan is running
+        self._start_when_ready = False  # Start pressed before the first scan batch arrived
+        self._scan_verifying = False  # list came from the catalog; scan only checks for changes
+        self._scan_results = []
+        self.catalog = MediaCatalog()
+        self.search_index = SearchIndex()
+        self.prober = MediaProber(self.catalog)
+        self.proxies = VideoProxyCache(self.prober, enabled=VIDEO_PROXIES and VLC_AVAILABLE)
+        self.disk_cache = DiskImageCache()
+        posters = PosterExtractor() if VLC_AVAILABLE else None
+        if DECODE_PROCESSES:
+            self.image_loader = ProcessImageLoader(disk_cache=self.disk_cache, posters=posters)
+        else:
+            self.image_loader = ImageLoader(disk_cache=self.disk_cache, posters=posters)
+        self.image_cache = ImageCache()
+        self.prefetcher = ImagePrefetcher(self.image_loader, self.image_cache)
+        self.readahead = ReadAhead()
+        # full-quality pass for an image shown as a preview; a newer request replaces an older one
+        self.refiner = ImagePrefetcher(self.image_loader, self.image_cache, workers=1,
+                                       on_ready=lambda p, size, ok: self._post_ui(self._on_refined, p, size, ok))
+        self._showing_preview = False
+        self._keeping_outgoing = False  # _showing_preview, with the previous image still up
+        # thumbnails for the grid view, on their own small pool so browsing never delays playback
+        self.thumb_cache = ImageCache(THUMB_CACHE_BYTES)
+        self.thumb_loader = ImageLoader(disk_cache=self.disk_cache, posters=posters, background=True)
+        self.thumbnailer = ImagePrefetcher(self.thumb_loader, self.thumb_cache, workers=THUMB_WORKERS,
+                                           on_ready=lambda p, size, ok: self._post_ui(self._on_thumbnail_ready, p, ok))
+        self.grid_view = None  # ThumbnailGrid while the grid window is open
+        # (index, path) picks play_next will make, decided ahead so they can be prefetched
+        self._upcoming = collections.deque()
+        # image on screen, and a screen-sized decode of it reused when the panel is resized
+        self._shown_image_path = None
+        self._shown_size = None
+        self._source = None  # (path, stamp, image)
+        self._source_wanted = None  # (path, screen size) asked of the refiner by a resize
+        self._resize_after_id = None
+        self._animation = None  # AnimationDecoder for the image on screen, if animated
+        self._anim_after_id = None
+        self._shown_pil = None  # display-ready image on screen, the outgoing side of a transition
+        self._transition = None  # TransitionRenderer while a transition plays
+        self._transition_after_id = None
+        self.transition = tk.StringVar(value=TRANSITION)
+        self._search_after_id = None
+        self._search_gen = 0
+        self._files_version = 0  # bumped whenever self.files changes, to spot stale search results
+        self.watch_folder = tk.BooleanVar(value=False)
+        self._watcher = None  # FolderWatcher for the selected folder, when enabled
         self.is_running = False
         self.is_paused = False
         self.shuffle = tk.BooleanVar(value=True)
         self.interval_seconds = tk.IntVar(value=30)
         self.loop_videos = tk.BooleanVar(value=False)
 
-        # VLC players
+        # VLC players (the shared libvlc instance starts loading now, off the Tk thread)
+        prewarm_vlc()
         self.vlc_instance = None
         self.vlc_player = None
+        self._preloaded_media = {}  # path -> parsed vlc.Media for upcoming videos
+        # second player/surface holding the next video paused on its first frame
+        self._standby_player = None
+        self._standby_path = None
+        self._standby_primed = False
+        self._standby_rss = None  # resident memory before priming, to measure its cost
+        self._standby_cost = None  # bytes the last primed standby added
+        self._standby_after_id = None  # gives up on a standby that never starts playing
+        # the video on screen; what happens next is driven by its player's libvlc events
+        self._video_path = None
+        self._video_length_ms = 0
+        self._video_time_ms = 0
+        self._video_watchdog_id = None  # skips a video whose player stops reporting progress
 
         # SFX
         self.sfx_files = []
         self.enable_image_sfx = tk.BooleanVar(value=True)
         self.sfx_volume = tk.IntVar(value=80)
+        self.sfx_voices = SfxVoicePool()
 
         # BGM player
         self.bgm = BackgroundMusicPlayer()
@@ -234,12 +2981,14 @@ class MemePlayer(tk.Tk):
 
         # UI timer/progress
         self._after_id = None
-        self._video_stop_timer = None
         self._countdown_seconds_left = 0
 
         # hotkey registration flag
         self.hotkeys_registered = False
 
+        # results posted by worker threads, drained on the Tk loop
+        self._ui_queue = queue.Queue()
+
         # build UI
         self.setup_ui()
 
@@ -251,6 +3000,8 @@ class MemePlayer(tk.Tk):
         # setup global hotkeys if possible
         self._setup_hotkeys()
 
+        self._drain_ui_queue()
+
     # ---------------- UI ----------------
     def setup_ui(self):
         # Top row: folder/select, playlist controls, search
@@ -258,12 +3009,16 @@ class MemePlayer(tk.Tk):
         top_frame.pack(side='top', fill='x', padx=8, pady=6)
 
         ttk.Button(top_frame, text='Select Folder', command=self.select_folder).pack(side='left')
+        ttk.Button(top_frame, text='Rebuild Catalog', command=self.rebuild_catalog).pack(side='left', padx=(6, 0))
         ttk.Button(top_frame, text='Start', command=self.start).pack(side='left', padx=6)
         ttk.Button(top_frame, text='Stop', command=self.stop).pack(side='left')
         ttk.Button(top_frame, text='Prev', command=self.play_prev).pack(side='left', padx=6)
         ttk.Button(top_frame, text='Next', command=self.play_next).pack(side='left')
 
-        ttk.Checkbutton(top_frame, text='Shuffle', variable=self.shuffle).pack(side='left', padx=8)
+        ttk.Checkbutton(top_frame, text='Shuffle', variable=self.shuffle,
+                        command=self._invalidate_upcoming).pack(side='left', padx=8)
+        ttk.Checkbutton(top_frame, text='Watch folder', variable=self.watch_folder,
+                        command=self._on_watch_toggle).pack(side='left', padx=(0, 8))
 
         ttk.Label(top_frame, text='Interval (s):').pack(side='left')
         ttk.Spinbox(top_frame, from_=5, to=3600, textvariable=self.interval_seconds, width=6).pack(side='left',
@@ -288,7 +3043,7 @@ class MemePlayer(tk.Tk):
         self.search_var = tk.StringVar()
         search_entry = ttk.Entry(pl_frame, textvariable=self.search_var, width=30)
         search_entry.pack(side='left')
-        search_entry.bind('<KeyRelease>', lambda e: self._apply_search_filter())
+        search_entry.bind('<KeyRelease>', lambda e: self._on_search_key())
 
         # Timer + progress bar area
         timer_frame = ttk.Frame(self)
@@ -297,6 +3052,13 @@ class MemePlayer(tk.Tk):
         self.timer_label.pack(side='left', padx=(0, 12))
         self.progress = ttk.Progressbar(timer_frame, orient='horizontal', length=300, mode='determinate')
         self.progress.pack(side='left')
+        ttk.Label(timer_frame, text='Transition:').pack(side='left', padx=(12, 2))
+        ttk.Combobox(timer_frame, textvariable=self.transition, values=TRANSITIONS, state='readonly',
+                     width=10).pack(side='left')
+
+        # Folder scan progress (hidden while idle)
+        self.scan_cancel_button = ttk.Button(timer_frame, text='Cancel Scan', command=self._cancel_scan)
+        self.scan_progress = ttk.Progressbar(timer_frame, orient='horizontal', length=120, mode='indeterminate')
 
         # SFX and BGM controls
         sfx_frame = ttk.Frame(self)
@@ -333,8 +3095,12 @@ class MemePlayer(tk.Tk):
         left = ttk.Frame(main_frame, width=300)
         left.pack(side='left', fill='y', padx=(0, 6))
 
-        ttk.Label(left, text='Files:').pack(anchor='w')
-        self.listbox = tk.Listbox(left, width=45, selectmode='extended')
+        files_header = ttk.Frame(left)
+        files_header.pack(fill='x')
+        ttk.Label(files_header, text='Files:').pack(side='left')
+        ttk.Button(files_header, text='Thumbnail Grid', command=self.open_grid_view).pack(side='right')
+        # virtual list: only visible rows are rendered from self.filtered_files
+        self.listbox = VirtualListbox(left, width=45, selectmode='extended', formatter=self._display_name)
         self.listbox.pack(fill='both', expand=True)
         self.listbox.bind('<Double-Button-1>', lambda e: self._on_list_double())
 
@@ -342,12 +3108,21 @@ class MemePlayer(tk.Tk):
         right = ttk.Frame(main_frame)
         right.pack(side='left', fill='both', expand=True)
 
-        self.image_panel = tk.Label(right, bg='black')
+        # images are drawn on a canvas so the outgoing one stays up until its successor is ready
+        self.image_panel = tk.Canvas(right, bg='black', highlightthickness=0, borderwidth=0)
         self.image_panel.pack(fill='both', expand=True)
+        self.image_panel.bind('<Configure>', self._on_panel_configure)
+        self._panel_image_item = self.image_panel.create_image(0, 0, anchor='center')
+        self._panel_text_item = self.image_panel.create_text(0, 0, anchor='center', fill='white',
+                                                             font=('Arial', 16), justify='center')
 
         self.video_panel = ttk.Frame(right)
         self.video_panel.place(relx=0, rely=0, relwidth=1, relheight=1)
         self.video_panel.lower(self.image_panel)
+        # the standby player renders here, underneath everything, until it is swapped in
+        self._standby_panel = ttk.Frame(right)
+        self._standby_panel.place(relx=0, rely=0, relwidth=1, relheight=1)
+        self._standby_panel.lower()
 
         # Bottom status bar
         self.status_var = tk.StringVar(value='No folder selected')
@@ -467,8 +3242,9 @@ class MemePlayer(tk.Tk):
         files = self.playlists.get(name, [])
         # filter to files that still exist
         files = [f for f in files if os.path.exists(f)]
-        self.files = files
-        self._apply_search_filter()  # update filtered_files & UI
+        self._cancel_scan()
+        self._stop_watcher()
+        self._set_files(files)  # update filtered_files & UI
         self._safe_status_set(f'Loaded playlist "{name}" ({len(self.files)} files).')
 
     # ---------------- Folder / file loading ----------------
@@ -478,53 +3254,325 @@ class MemePlayer(tk.Tk):
             return
         self.folder = folder
         self._load_files()
-        self._safe_status_set(f'Selected {self.folder} — {len(self.files)} playable files')
 
     def _load_files(self):
-        self.files = []
+        # any scan or watch of a previously selected folder is abandoned
+        self._cancel_scan()
+        self._stop_watcher()
+        self.current_index = None
+        # a known folder is shown straight from the catalog, then checked for changes
+        self._set_files(self.catalog.cached_files(self.folder) if self.folder else [])
+        if not self.folder:
+            return
+        self._scan_verifying = bool(self.files)
+        self._scan_results = []
+        scanner = FolderScanner(self.folder,
+                                on_batch=lambda s, batch: self._post_ui(self._on_scan_batch, s, batch),
+                                on_done=lambda s: self._post_ui(self._on_scan_done, s),
+                                catalog=self.catalog)
+        self._scanner = scanner
+        self.scan_progress.pack(side='left', padx=(12, 4))
+        self.scan_cancel_button.pack(side='left')
+        self.scan_progress.start(15)
+        if self._scan_verifying:
+            self._safe_status_set(f'Selected {self.folder} — {len(self.files)} playable files '
+                                  f'(from catalog, checking for changes ...)')
+        else:
+            self._safe_status_set(f'Scanning {self.folder} ...')
+        scanner.start()
+
+    def rebuild_catalog(self):
         if not self.folder:
+            messagebox.showinfo('No folder', 'Select a folder first.')
+            return
+        self._cancel_scan()
+        self.catalog.forget_root(self.folder)
+        self._load_files()
+
+    def _on_scan_batch(self, scanner, batch):
+        if scanner is not self._scanner:
+            return  # stale batch from a cancelled scan
+        if self._scan_verifying:
+            self._scan_results.extend(batch)
             return
-        for root, dirs, files in os.walk(self.folder):
-            for fn in files:
-                if fn.lower().endswith(PLAYABLE_EXTS):
-                    self.files.append(os.path.join(root, fn))
-        self.files.sort()
-        # after loading files, apply search filter and update listbox
+        self.files.extend(batch)
+        self._files_version += 1
+        self.search_index.add(batch)
+        self.prober.request(batch)
+        self.proxies.request(batch)
+        # batches arrive in sorted order, so only the new matches need appending
+        matched = [f for f in batch if self._search_matches(f)]
+        self.filtered_files.extend(matched)
+        if matched:
+            self._invalidate_upcoming()
+        for view in self._list_views():
+            view.items_inserted(len(self.filtered_files) - len(matched), len(matched))
+        self._safe_status_set(f'Scanning {self.folder} ... {scanner.files_found} files '
+                              f'in {scanner.dirs_scanned} folders')
+        if self._start_when_ready and self.filtered_files:
+            self._start_when_ready = False
+            self.start()
+
+    def _on_scan_done(self, scanner):
+        if scanner is not self._scanner:
+            return
+        self._scanner = None
+        self._hide_scan_progress()
+        if self._scan_verifying:
+            self._scan_verifying = False
+            if self._scan_results != self.files:
+                self._set_files(self._scan_results)
+            self._scan_results = []
+        self._safe_status_set(f'Selected {self.folder} — {len(self.files)} playable files')
+        if self.watch_folder.get():
+            self._start_watcher()
+        if self._start_when_ready:
+            self._start_when_ready = False
+            self._safe_status_set(f'No playable files found in {self.folder}')
+
+    def _set_files(self, files):
+        """Swap in a new file list; the item on screen stays selected if it is still there."""
+        self.files = files
+        self._files_version += 1
+        self.search_index.reset(self.folder, files)
+        self.prober.reset(self.folder, files)
+        self.proxies.reset(files)
         self._apply_search_filter()
-        self.current_index = None
+
+    def _cancel_scan(self):
+        self._start_when_ready = False
+        self._scan_verifying = False
+        self._scan_results = []
+        if self._scanner is None:
+            return
+        self._scanner.cancel()
+        self._safe_status_set(f'Scan cancelled — {len(self.files)} playable files')
+        self._scanner = None
+        self._hide_scan_progress()
+
+    def _hide_scan_progress(self):
+        self.scan_progress.stop()
+        self.scan_progress.pack_forget()
+        self.scan_cancel_button.pack_forget()
+
+    # ---------------- Folder watching ----------------
+    def _on_watch_toggle(self):
+        if not self.watch_folder.get():
+            self._stop_watcher()
+            self._safe_status_set('Folder watching off')
+        elif self._scanner is None:
+            self._start_watcher()
+        # otherwise the watcher starts once the running scan completes
+
+    def _start_watcher(self):
+        self._stop_watcher()
+        if not self.folder:
+            return
+        watcher = FolderWatcher(self.folder, self.files,
+                                on_change=lambda w, added, removed: self._post_ui(self._on_watch_changes, w, added,
+                                                                                  removed),
+                                catalog=self.catalog)
+        self._watcher = watcher
+        watcher.start()
+        self._safe_status_set(f'Watching {self.folder} for changes')
+
+    def _stop_watcher(self):
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def _on_watch_changes(self, watcher, added, removed):
+        if watcher is not self._watcher:
+            return
+        # apply as deltas so the item on screen and the countdown carry on untouched
+        current = self._current_path()
+        for path in removed:
+            self._remove_file(path)
+        for path in added:
+            self._insert_file(path)
+        if current is not None:
+            self._reselect_path(current)
+        self._safe_status_set(f'Folder changed: +{len(added)} / -{len(removed)} — '
+                              f'{len(self.files)} playable files')
+
+    def _sort_key(self, path):
+        return FolderScanner.sort_key(self.folder, path)
+
+    def _sorted_position(self, seq, path):
+        i = bisect.bisect_left(seq, self._sort_key(path), key=self._sort_key)
+        return i, i < len(seq) and seq[i] == path
+
+    def _remove_file(self, path):
+        i, found = self._sorted_position(self.files, path)
+        if found:
+            del self.files[i]
+            self._files_version += 1
+            self.search_index.remove([path])
+        j, found = self._sorted_position(self.filtered_files, path)
+        if found:
+            del self.filtered_files[j]
+            self._invalidate_upcoming()
+            for view in self._list_views():
+                view.items_deleted(j)
+
+    def _insert_file(self, path):
+        i, found = self._sorted_position(self.files, path)
+        if found:
+            return
+        self.files.insert(i, path)
+        self._files_version += 1
+        self.search_index.add([path], appended=False)
+        self.prober.request([path])
+        self.proxies.request([path])
+        if self._search_matches(path):
+            j, _ = self._sorted_position(self.filtered_files, path)
+            self.filtered_files.insert(j, path)
+            self._invalidate_upcoming()
+            for view in self._list_views():
+                view.items_inserted(j)
+
+    def _current_path(self):
+        if self.current_index is not None and 0 <= self.current_index < len(self.filtered_files):
+            return self.filtered_files[self.current_index]
+        return None
+
+    def _reselect_path(self, path):
+        j, found = self._sorted_position(self.filtered_files, path)
+        for view in self._list_views():
+            view.selection_clear(0, 'end')
+        if found:
+            self.current_index = j
+            for view in self._list_views():
+                view.selection_set(j)
+        else:
+            # the item on screen was removed: carry on from where it used to be
+            self.current_index = j - 1 if j > 0 else None
 
     # ---------------- Search ----------------
+    def _on_search_key(self):
+        # debounce: only the last keystroke of a burst runs a query
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(SEARCH_DEBOUNCE_MS, self._apply_search_filter)
+
     def _apply_search_filter(self):
-        q = self.search_var.get().strip().lower()
-        if not q:
-            self.filtered_files = list(self.files)
-        else:
-            self.filtered_files = [f for f in self.files if q in os.path.basename(f).lower()]
+        self._search_after_id = None
+        self._search_gen += 1
+        if not self.search_var.get().strip():
+            self.search_index.cancel_queries()
+            self._set_filtered(list(self.files))
+            return
+        gen, version = self._search_gen, self._files_version
+        self.search_index.query(self.search_var.get(),
+                                lambda result: self._post_ui(self._on_search_result, gen, version, result))
+
+    def _on_search_result(self, gen, version, result):
+        if gen != self._search_gen:
+            return  # superseded by a newer query
+        self._set_filtered(result)
+        if version != self._files_version:
+            # files arrived or changed while the query ran; the index has them now
+            self._apply_search_filter()
+
+    def _set_filtered(self, files):
+        current = self._current_path()
+        self.filtered_files = files
+        self._invalidate_upcoming()
         self._refresh_listbox()
+        try:
+            self.current_index = files.index(current) if current else None
+        except ValueError:
+            self.current_index = None
+        if self.current_index is not None:
+            for view in self._list_views():
+                view.selection_set(self.current_index)
+
+    def _search_matches(self, path):
+        q = SearchIndex.normalize(self.search_var.get().strip())
+        return not q or q in SearchIndex.key(self.folder, path)
 
     def _refresh_listbox(self):
-        self.listbox.delete(0, 'end')
-        for f in self.filtered_files:
-            self.listbox.insert('end', os.path.relpath(f, self.folder) if self.folder else f)
+        for view in self._list_views():
+            view.set_items(self.filtered_files)
+
+    def _list_views(self):
+        """Widgets showing self.filtered_files: the file list, plus the grid when open."""
+        if self.grid_view is None:
+            return (self.listbox,)
+        return (self.listbox, self.grid_view)
+
+    def _display_name(self, path):
+        return os.path.relpath(path, self.folder) if self.folder else path
+
+    # ---------------- Thumbnail grid ----------------
+    def open_grid_view(self):
+        if self.grid_view is not None:
+            self.grid_view.winfo_toplevel().lift()
+            return
+        win = tk.Toplevel(self)
+        win.title('MemePlayer — Thumbnails')
+        win.geometry('900x600')
+        grid = ThumbnailGrid(win, self.thumbnailer, self.thumb_cache, formatter=os.path.basename)
+        grid.pack(fill='both', expand=True)
+        grid.bind('<Double-Button-1>', lambda e: self._on_grid_double())
+        grid.bind('<Return>', lambda e: self._on_grid_double())
+        grid.bind('<<ListboxSelect>>', lambda e: self._on_grid_select())
+        win.protocol('WM_DELETE_WINDOW', self.close_grid_view)
+        self.grid_view = grid
+        grid.set_items(self.filtered_files)
+        if self.current_index is not None:
+            grid.selection_set(self.current_index)
+            grid.see(self.current_index)
+
+    def close_grid_view(self):
+        if self.grid_view is None:
+            return
+        grid, self.grid_view = self.grid_view, None
+        grid.close()
+        grid.winfo_toplevel().destroy()
+
+    def _on_grid_select(self):
+        # mirror into the file list so playlist actions see the same selection
+        self.listbox.selection_clear(0, 'end')
+        for i in self.grid_view.curselection():
+            self.listbox.selection_set(i)
+
+    def _on_grid_double(self):
+        sel = self.grid_view.curselection()
+        if not sel:
+            return
+        self._invalidate_upcoming()
+        self.current_index = sel[0]
+        self._play_current()
+
+    def _on_thumbnail_ready(self, path, ok):
+        if self.grid_view is not None:
+            self.grid_view.thumbnail_ready(path, ok)
 
     # ---------------- Playback control ----------------
     def start(self):
+        if not self.filtered_files and self._scanner is not None:
+            # folder is still being scanned; begin as soon as the first files arrive
+            self._start_when_ready = True
+            self._safe_status_set('Waiting for the first files from the folder scan ...')
+            return
         if not self.filtered_files:
             messagebox.showwarning('No files', 'No playable files loaded.')
             return
         if not VLC_AVAILABLE and any(p.lower().endswith(VIDEO_EXTS) for p in self.filtered_files):
             messagebox.showwarning('VLC missing', 'Video files found but python-vlc is not available. Install python-vlc and VLC.')
         # init vlc players
-        if VLC_AVAILABLE and not self.vlc_instance:
+        if VLC_AVAILABLE and not self.vlc_player:
+            self.vlc_instance = get_vlc_instance()  # normally warmed up by now
             try:
-                self.vlc_instance = vlc.Instance()
                 self.vlc_player = self.vlc_instance.media_player_new()
+                self._watch_player_events(self.vlc_player)
             except Exception:
                 self.vlc_instance = None
                 self.vlc_player = None
         self.is_running = True
         self.is_paused = False
-        self.status_var.set('Running')
+        self.status_var.set(f'Running (VLC profile: {vlc_profile_name})' if vlc_profile_name else 'Running')
         if self.current_index is None:
             self.current_index = 0
         # immediate play
@@ -535,7 +3583,9 @@ class MemePlayer(tk.Tk):
         self.is_paused = False
         self._cancel_timers()
         self._stop_video()
-        self.image_panel.config(image='', text='')
+        self._cancel_standby()
+        self._forget_shown_image()
+        self._panel_clear()
         self.status_var.set('Stopped')
 
     def toggle_pause(self):
@@ -543,8 +3593,10 @@ class MemePlayer(tk.Tk):
             return
         if self.is_paused:
             self.is_paused = False
-            if self._after_id is None:
+            if self._after_id is None and self._video_path is None:
                 self._after_id = self.after(self.interval_seconds.get() * 1000, self.play_next)
+            elif self._video_path is not None:
+                self._arm_video_watchdog(VIDEO_STALL_SECONDS)
             if self.vlc_player and VLC_AVAILABLE:
                 try:
                     self.vlc_player.play()
@@ -564,6 +3616,7 @@ class MemePlayer(tk.Tk):
     def play_prev(self):
         if not self.filtered_files:
             return
+        self._invalidate_upcoming()
         if self.shuffle.get():
             self.current_index = random.randrange(len(self.filtered_files))
         else:
@@ -576,19 +3629,35 @@ class MemePlayer(tk.Tk):
     def play_next(self):
         if not self.filtered_files:
             return
-        if self.shuffle.get():
-            self.current_index = random.randrange(len(self.filtered_files))
-        else:
-            if self.current_index is None:
-                self.current_index = 0
-            else:
-                self.current_index = (self.current_index + 1) % len(self.filtered_files)
+        self._peek_upcoming(1)
+        self.current_index = self._upcoming.popleft()[0]
         self._play_current()
 
+    def _peek_upcoming(self, count):
+        """Paths play_next will pick over the next `count` steps. Picks (including
+        shuffle picks) are decided here ahead of time so they can be prefetched.
+        """
+        files = self.filtered_files
+        if not files:
+            return []
+        while len(self._upcoming) < count:
+            if self.shuffle.get():
+                idx = random.randrange(len(files))
+            else:
+                last = self._upcoming[-1][0] if self._upcoming else self.current_index
+                idx = 0 if last is None else (last + 1) % len(files)
+            self._upcoming.append((idx, files[idx]))
+        return [path for _idx, path in itertools.islice(self._upcoming, count)]
+
+    def _invalidate_upcoming(self):
+        # indices shifted or the order changed: decide the picks again
+        self._upcoming.clear()
+
     def _on_list_double(self):
         sel = self.listbox.curselection()
         if not sel:
             return
+        self._invalidate_upcoming()
         self.current_index = sel[0]
         self._play_current()
 
@@ -598,10 +3667,11 @@ class MemePlayer(tk.Tk):
         if idx is None or idx < 0 or idx >= len(self.filtered_files):
             return
         path = self.filtered_files[idx]
-        # highlight in listbox
-        self.listbox.selection_clear(0, 'end')
-        self.listbox.selection_set(idx)
-        self.listbox.see(idx)
+        # highlight in listbox (and grid)
+        for view in self._list_views():
+            view.selection_clear(0, 'end')
+            view.selection_set(idx)
+            view.see(idx)
 
         ext = os.path.splitext(path)[1].lower()
         if ext in IMAGE_EXTS:
@@ -619,17 +3689,58 @@ class MemePlayer(tk.Tk):
                 if self.is_running and not self.is_paused:
                     self._start_countdown(self.interval_seconds.get())
             else:
+                # advancing, looping and skipping follow the player's events (_on_video_event)
                 self._play_video(path)
-                # if loop_videos is True -> don't advance automatically; loop same video
-                if self.loop_videos.get():
-                    # schedule to restart same video after its length
-                    self._start_countdown_for_video_loop(path)
-                else:
-                    # schedule next after interval_seconds
-                    if self.is_running and not self.is_paused:
-                        self._start_countdown(self.interval_seconds.get())
         else:
             self.status_var.set('Unknown file type: ' + path)
+        self._schedule_prefetch()
+
+    def _schedule_prefetch(self):
+        size = self._panel_size()
+        # warm the page cache for what will be opened from the source: not images the
+        # disk cache already has, and a video's proxy when it has one
+        ahead = []
+        for p in self._peek_upcoming(READAHEAD_DEPTH):
+            if p.lower().endswith(VIDEO_EXTS):
+                ahead.append(self.proxies.lookup(p) or p)
+            elif not self.disk_cache.contains(p, size):
+                ahead.append(p)
+        self.readahead.warm(ahead)
+        upcoming = self._peek_upcoming(PREFETCH_DEPTH)
+        # upcoming videos get their poster frame prepared alongside the images
+        stills = IMAGE_EXTS + VIDEO_EXTS if self.image_loader.posters is not None else IMAGE_EXTS
+        self.prefetcher.prefetch([p for p in upcoming if p.lower().endswith(stills)], size)
+        nxt = upcoming[0] if upcoming else None
+        self._prime_standby(nxt if nxt and nxt.lower().endswith(VIDEO_EXTS) else None)
+        self.proxies.request(upcoming, urgent=True)
+        videos = [p for p in upcoming if p.lower().endswith(VIDEO_EXTS) and p != self._standby_path]
+        self._preload_videos(videos[:VIDEO_PRELOAD_DEPTH])
+
+    def _preload_videos(self, paths):
+        """Create and parse (asynchronously, in libvlc) the media of upcoming videos,
+        releasing any preloaded media no longer coming up.
+        """
+        for path in [p for p in self._preloaded_media if p not in paths]:
+            self._release_media(self._preloaded_media.pop(path))
+        instance = get_vlc_instance(wait=False) if self.vlc_player else None
+        if instance is None:
+            return
+        for path in paths:
+            if path in self._preloaded_media:
+                continue
+            try:
+                media = new_vlc_media(self.proxies.lookup(path) or path)
+                media.parse_with_options(vlc.MediaParseFlag.local, int(PROBE_TIMEOUT_SECONDS * 1000))
+                self._preloaded_media[path] = media
+            except Exception:
+                pass
+
+    @staticmethod
+    def _release_media(media):
+        try:
+            media.release()
+        except Exception:
+            pass
 
     # ---------------- Timer / Countdown helpers ----------------
     def _start_countdown(self, seconds):
@@ -653,27 +3764,8 @@ class MemePlayer(tk.Tk):
         self._countdown_seconds_left -= 1
         self._after_id = self.after(1000, self._tick_countdown)
 
-    def _start_countdown_for_video_loop(self, path):
-        # attempt to read video length via VLC; if not available fallback to interval_seconds
-        self._cancel_timers()
-        length_s = None
-        try:
-            media = self.vlc_instance.media_new(path)
-            # parse media to get duration (may be async)
-            media.parse_with_options(parse_flag=0, timeout=1)
-            length_ms = media.get_duration()
-            if length_ms and length_ms > 0:
-                length_s = length_ms // 1000
-        except Exception:
-            length_s = None
-        if not length_s or length_s <= 0:
-            length_s = self.interval_seconds.get()
-        self._countdown_seconds_left = length_s
-        self.progress['maximum'] = length_s
-        self.progress['value'] = 0
-        self._tick_countdown()
-
     def _cancel_timers(self):
+        self._cancel_video_watchdog()
         if self._after_id:
             try:
                 self.after_cancel(self._after_id)
@@ -685,35 +3777,386 @@ class MemePlayer(tk.Tk):
             self.timer_label.config(text='Next meme in: --')
 
     # ---------------- Display helpers ----------------
+    def _panel_size(self):
+        # before the window is mapped Tk reports 1x1
+        panel_w = self.image_panel.winfo_width()
+        panel_h = self.image_panel.winfo_height()
+        return (panel_w if panel_w > 1 else 800, panel_h if panel_h > 1 else 450)
+
     def _show_image(self, path):
-        self.image_panel.lift(self.video_panel)
-        try:
-            img = Image.open(path)
-            panel_w = self.image_panel.winfo_width() or 800
-            panel_h = self.image_panel.winfo_height() or 450
-            img.thumbnail((panel_w, panel_h), Image.LANCZOS)
-            self._imgtk = ImageTk.PhotoImage(img)
-            self.image_panel.config(image=self._imgtk, text='')
-            self.status_var.set(f'Displaying image: {os.path.basename(path)}')
+        self.video_panel.lower(self.image_panel)
+        try:
+            size = self._panel_size()
+            preview = defer = False
+            if PROGRESSIVE_RENDER:
+                img = self.prefetcher.take(path, size, timeout=PREVIEW_BUDGET_MS / 1000.0)
+                if img is None:
+                    img = self.image_cache.get(path, size)
+                if img is None:
+                    img = self.image_loader.preview(path, size)
+                    preview = img is not None
+                    defer = not preview and not self.image_loader.decodes_quickly(path, size)
+            else:
+                img = self.prefetcher.take(path, size)
+            if img is None and self.image_loader.decodes_in_child(path, size):
+                self._show_shrinking(path, size)
+                return
+            if defer:
+                self._show_deferred(path, size)
+                return
+            if img is None:
+                img = self.image_cache.load(path, size, self.image_loader)
+            if path != self._shown_image_path:
+                self._source = None
+            self._source_wanted = None
+            self._set_panel_image(img, path, size, preview=preview, transition=True)
+            if preview:
+                self.refiner.prefetch([path], size)
+            self._start_animation(path, size)
+            self.status_var.set(f'Displaying image: {os.path.basename(path)} '
+                                f'(prefetch hits {self.prefetcher.hits}, misses {self.prefetcher.misses})')
+        except ImageTooLarge as e:
+            self._show_too_large(path, e)
+        except Exception as e:
+            self.status_var.set('Error showing image: ' + str(e))
+
+    def _show_shrinking(self, path, size):
+        # an oversized image is shrunk by a child process off the Tk thread; the
+        # refiner swaps the result in for this placeholder (_on_refined)
+        self._forget_shown_image()
+        self._panel_text(f'Shrinking large image ...\n{os.path.basename(path)}')
+        self._shown_image_path = path
+        self._shown_size = size
+        self._showing_preview = True
+        self.refiner.prefetch([path], size)
+        self.status_var.set('Shrinking large image: ' + os.path.basename(path))
+
+    def _show_deferred(self, path, size):
+        # no quick preview for this format: the outgoing image stays up while the
+        # refiner decodes this one off the Tk thread (_on_refined swaps it in)
+        self._stop_animation()
+        self._source = None
+        self._source_wanted = None
+        self._shown_image_path = path
+        self._shown_size = size
+        self._showing_preview = True
+        self._keeping_outgoing = True
+        self.refiner.prefetch([path], size)
+        self.status_var.set('Decoding image: ' + os.path.basename(path))
+
+    def _show_too_large(self, path, error=None):
+        self._forget_shown_image()
+        detail = f'\n{error}' if error else ''
+        self._panel_text(f'Image too large to show\n{os.path.basename(path)}{detail}')
+        self.status_var.set('Image too large: ' + os.path.basename(path))
+
+    def _set_panel_image(self, img, path, size, preview=False, transition=False):
+        photo = ImageTk.PhotoImage(img)
+        if self._transition is not None and not transition and path == self._shown_image_path:
+            self._transition.final = photo  # refined or re-rendered mid-transition: shown at its end
+        else:
+            old = self._shown_pil
+            self._cancel_transition()
+            if not (transition and self._start_transition(old, img, photo)):
+                self._panel_show(photo)
+        self._shown_pil = img
+        self._shown_image_path = path
+        self._shown_size = size
+        self._showing_preview = preview
+        self._keeping_outgoing = False
+
+    def _on_refined(self, path, size, ok):
+        if (path, size) == self._source_wanted:
+            self._on_source_ready(path, ok)
+            return
+        # swap the full-quality image in for the preview, unless something else replaced it
+        if not ok and self._showing_preview and path == self._shown_image_path:
+            if self._keeping_outgoing:
+                self._forget_shown_image()
+                self._panel_clear()
+                self.status_var.set('Error showing image: ' + os.path.basename(path))
+            elif self._shown_pil is None:
+                self._show_too_large(path)  # the shrinking placeholder's child process failed
+            return
+        if (not ok or not self._showing_preview or path != self._shown_image_path or size != self._shown_size
+                or self._animation is not None):
+            return
+        img = self.image_cache.get(path, size)
+        if img is None:
+            return
+        if self._keeping_outgoing:
+            # first sight of this image: the same way in as _show_image
+            self._set_panel_image(img, path, size, transition=True)
+            self._start_animation(path, size)
+            self.status_var.set('Displaying image: ' + os.path.basename(path))
+        else:
+            self._set_panel_image(img, path, size)
+
+    def _on_source_ready(self, path, ok):
+        # the screen-size source a resize asked for: re-render the stand-in from it
+        self._source_wanted = None
+        if not ok or path != self._shown_image_path or not self._showing_preview or self._animation is not None:
+            return
+        try:
+            source = self._source_image(path)
+            if source is not None:
+                self._render_from_source(source, path, self._shown_size)
+        except Exception as e:
+            self.status_var.set('Error showing image: ' + str(e))
+
+    def _forget_shown_image(self):
+        self._stop_animation()
+        self._cancel_transition()
+        self._shown_pil = None
+        self._shown_image_path = None
+        self._shown_size = None
+        self._source = None
+        self._source_wanted = None
+        self._showing_preview = False
+        self._keeping_outgoing = False
+
+    def _on_panel_configure(self, _event):
+        self._center_panel_items()
+        # a window drag fires a burst of these: render once it settles
+        if self._resize_after_id is not None:
+            self.after_cancel(self._resize_after_id)
+        self._resize_after_id = self.after(RESIZE_SETTLE_MS, self._rerender_image)
+
+    def _rerender_image(self):
+        self._resize_after_id = None
+        path = self._shown_image_path
+        size = self._panel_size()
+        if path is None or size == self._shown_size:
+            return
+        if self._keeping_outgoing:
+            self._show_deferred(path, size)  # still being decoded: ask again at the new size
+            return
+        if self._shown_pil is None:
+            self._show_shrinking(path, size)  # still being shrunk: ask again at the new size
+            return
+        try:
+            source = self._source_image(path)
+            if source is None:
+                # first resize of this image: stretch what is on screen until the
+                # refiner has decoded the screen-size source (_on_refined)
+                self._set_panel_image(self._quick_resize(self._shown_pil, size), path, size, preview=True)
+                self._source_wanted = (path, self._screen_size())
+                self.refiner.prefetch([path], self._source_wanted[1])
+            else:
+                self._render_from_source(source, path, size)
+            self._start_animation(path, size)
+        except ImageTooLarge as e:
+            self._show_too_large(path, e)
         except Exception as e:
             self.status_var.set('Error showing image: ' + str(e))
+        # upcoming images were prepared for the old size
+        self._schedule_prefetch()
+
+    def _render_from_source(self, source, path, size):
+        img = source.copy()
+        img.thumbnail(size, self.image_loader.resample, reducing_gap=None)
+        self._set_panel_image(img, path, size)
+
+    def _quick_resize(self, img, size):
+        # bilinear stand-in; an image smaller than the panel was at its own size and stays there
+        scale = min(size[0] / img.width, size[1] / img.height)
+        if self._shown_size and img.width < self._shown_size[0] and img.height < self._shown_size[1]:
+            scale = min(scale, 1.0)
+        fit = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        return img.resize(fit, Image.BILINEAR)
+
+    def _screen_size(self):
+        return (self.winfo_screenwidth(), self.winfo_screenheight())
+
+    def _source_image(self, path):
+        """Screen-sized decode of the image on screen, reused on every resize. Only
+        sources that decode quickly are decoded here; otherwise None until the
+        refiner has put one in the image cache.
+        """
+        stamp = ImageCache.stamp(path)
+        if self._source is None or self._source[:2] != (path, stamp):
+            screen = self._screen_size()
+            img = self.image_cache.get(path, screen, stamp)
+            if img is None and self.image_loader.decodes_quickly(path, screen):
+                img = self.image_loader.load(path, screen)
+            if img is None:
+                return None
+            self._source = (path, stamp, img)
+        return self._source[2]
+
+    # ---------------- Animation ----------------
+    def _start_animation(self, path, size):
+        # the first frame is already on screen; an animated file carries on from the decoder
+        self._stop_animation()
+        if not path.lower().endswith(ANIMATED_EXTS):
+            return
+        self._animation = AnimationDecoder(path, size, self.image_loader.resample)
+        self._anim_after_id = self.after(1, self._animation_tick)
+
+    def _stop_animation(self):
+        if self._anim_after_id is not None:
+            self.after_cancel(self._anim_after_id)
+            self._anim_after_id = None
+        if self._animation is not None:
+            self._animation.stop()
+            self._animation = None
+
+    def _animation_tick(self):
+        self._anim_after_id = None
+        anim = self._animation
+        if anim is None:
+            return
+        if self._transition is not None:
+            # hold the animation until the transition into it has finished
+            anim.deadline = None
+            self._anim_after_id = self.after(TRANSITION_FRAME_MS, self._animation_tick)
+            return
+        frame = anim.next_frame()
+        if frame is None:
+            if anim.finished and anim.frames.empty():
+                self._animation = None  # still image, or the decoder gave up
+                return
+            # decoder behind: restart the clock from when the next frame turns up
+            anim.deadline = None
+            self._anim_after_id = self.after(5, self._animation_tick)
+            return
+        now = time.monotonic()
+        if anim.deadline is None:
+            anim.deadline = now
+        # frames whose whole slot has already passed are dropped, not shown late
+        while anim.deadline + frame[1] <= now:
+            later = anim.next_frame()
+            if later is None:
+                break
+            anim.deadline += frame[1]
+            anim.dropped += 1
+            frame = later
+        img, duration = frame
+        if anim.photo is None or anim.photo.width() != img.size[0] or anim.photo.height() != img.size[1]:
+            anim.photo = ImageTk.PhotoImage(img)
+            self._panel_show(anim.photo)
+        else:
+            anim.photo.paste(img)
+        self._shown_pil = img
+        # deadlines advance by the frame durations, so timer jitter never accumulates
+        anim.deadline += duration
+        delay = max(1, int((anim.deadline - time.monotonic()) * 1000))
+        self._anim_after_id = self.after(delay, self._animation_tick)
+
+    # ---------------- Transitions ----------------
+    def _start_transition(self, old, new, final):
+        """Play the selected transition from old to new, ending on the PhotoImage final.
+        False if there is nothing to transition from or transitions are off.
+        """
+        kind = self.transition.get()
+        if kind not in TRANSITIONS or kind == 'none' or not NUMPY_AVAILABLE or old is None:
+            return False
+        count = max(2, TRANSITION_MS // TRANSITION_FRAME_MS)
+        self._transition = TransitionRenderer(old, new, self._panel_size(), kind, count)
+        self._transition.final = final
+        self._transition_after_id = self.after(1, self._transition_tick)
+        return True
+
+    def _cancel_transition(self):
+        if self._transition_after_id is not None:
+            self.after_cancel(self._transition_after_id)
+            self._transition_after_id = None
+        if self._transition is not None:
+            self._transition.stop()
+            self._transition = None
+
+    def _transition_tick(self):
+        self._transition_after_id = None
+        tr = self._transition
+        if tr is None:
+            return
+        slot = TRANSITION_FRAME_MS / 1000.0
+        due = int((time.monotonic() - tr.started) / slot)
+        if due >= tr.count:
+            self._cancel_transition()
+            self._panel_show(tr.final)
+            return
+        tr.due = max(1, due)
+        # skip frames whose slot has passed; a frame for a later slot waits for it
+        frame, tr.pending = tr.pending, None
+        while frame is None or frame[0] < due:
+            later = tr.next_frame()
+            if later is None:
+                break
+            if frame is not None:
+                tr.dropped += 1
+            frame = later
+        if frame is not None and frame[0] > due:
+            tr.pending, frame = frame, None
+        if frame is not None:
+            # double buffer: fill the hidden PhotoImage, then point the canvas at it
+            buf = tr.buffers[tr.back]
+            if buf is None or buf.width() != frame[1].width or buf.height() != frame[1].height:
+                buf = tr.buffers[tr.back] = ImageTk.PhotoImage(frame[1])
+            else:
+                buf.paste(frame[1])
+            self._panel_show(buf)
+            tr.back ^= 1
+        # the schedule follows the clock; a late tick shortens the wait to the next slot
+        delay = tr.started + (due + 1) * slot - time.monotonic()
+        self._transition_after_id = self.after(max(1, int(delay * 1000)), self._transition_tick)
+
+    # ---------------- Display panel ----------------
+    def _panel_show(self, photo):
+        self._imgtk = photo
+        self.image_panel.itemconfigure(self._panel_image_item, image=photo, state='normal')
+        self.image_panel.itemconfigure(self._panel_text_item, text='', state='hidden')
+        self._center_panel_items()
+
+    def _panel_text(self, text):
+        self._imgtk = None
+        self.image_panel.itemconfigure(self._panel_image_item, image='', state='hidden')
+        self.image_panel.itemconfigure(self._panel_text_item, text=text, state='normal')
+        self._center_panel_items()
+
+    def _panel_clear(self):
+        self._panel_text('')
+
+    def _center_panel_items(self):
+        w, h = self._panel_size()
+        self.image_panel.coords(self._panel_image_item, w // 2, h // 2)
+        self.image_panel.coords(self._panel_text_item, w // 2, h // 2)
 
     def _show_placeholder_video(self, path):
-        self.image_panel.lift(self.video_panel)
-        txt = f'Video file\n{os.path.basename(path)}\n(no video backend)'
-        self.image_panel.config(image='', text=txt, fg='white', font=('Arial', 16))
+        self.video_panel.lower(self.image_panel)
+        self._forget_shown_image()
+        self._panel_text(f'Video file\n{os.path.basename(path)}\n(no video backend)')
         self.status_var.set('Video file (no video backend): ' + os.path.basename(path))
 
     # ---------------- Video playback ----------------
     def _play_video(self, path):
         self.video_panel.lift(self.image_panel)
-        self.image_panel.config(image='', text='')
+        self._forget_shown_image()
+        self._panel_clear()
         if not self.vlc_player:
             return
+        meta = self.prober.get(path) or {}
+        self._video_path = path
+        self._video_length_ms = meta.get('duration_ms') or 0  # refined by LengthChanged
+        self._video_time_ms = 0
+        self._show_video_progress()
+        # opening may take a while, but nothing at all for this long means it is stuck
+        self._arm_video_watchdog(self.interval_seconds.get() + VIDEO_STALL_SECONDS)
+        self.proxies.set_busy(True)  # proxy transcoding waits while a video plays
+        if path == self._standby_path and self._standby_primed:
+            self._swap_in_standby()
+            cost = f', standby +{self._standby_cost // (1024 * 1024)} MB' if self._standby_cost is not None else ''
+            self.status_var.set(f'Playing video: {os.path.basename(path)} (gapless{cost})')
+            return
+        self._cancel_standby()  # not ready in time: open it the normal way
+        self._show_poster(path)
         try:
-            media = self.vlc_instance.media_new(path)
+            media = self._preloaded_media.pop(path, None)
+            if media is None:
+                media = new_vlc_media(self.proxies.lookup(path) or path)
             self.vlc_player.set_media(media)
-            self._attach_vlc_player_to_panel()
+            self._release_media(media)  # the player holds its own reference until the next set_media
+            self._attach_player(self.vlc_player, self.video_panel)
             try:
                 self.vlc_player.audio_set_volume(int(self.bgm_volume.get()))
             except Exception:
@@ -723,42 +4166,240 @@ class MemePlayer(tk.Tk):
         except Exception as e:
             self.status_var.set('Error playing video: ' + str(e))
 
-    def _attach_vlc_player_to_panel(self):
-        if not self.vlc_player:
+    def _show_poster(self, path):
+        """Cover the video panel with path's poster frame, if one is ready, until
+        the player renders its first frame (the 'vout' event).
+        """
+        size = self._panel_size()
+        poster = self.image_cache.get(path, size)
+        if poster is None:
+            poster = self.disk_cache.get(path, size)
+        if poster is None:
+            return
+        self._panel_show(ImageTk.PhotoImage(poster))
+        self.video_panel.lower(self.image_panel)
+
+    def _attach_player(self, player, panel):
+        if not player:
             return
         self.update_idletasks()
-        handle = self.video_panel.winfo_id()
+        handle = panel.winfo_id()
         if sys.platform.startswith('win'):
             try:
-                self.vlc_player.set_hwnd(handle)
+                player.set_hwnd(handle)
             except Exception:
                 pass
         elif sys.platform.startswith('linux'):
             try:
-                self.vlc_player.set_xwindow(handle)
+                player.set_xwindow(handle)
             except Exception:
                 try:
-                    self.vlc_player.set_xid(handle)
+                    player.set_xid(handle)
                 except Exception:
                     pass
         elif sys.platform.startswith('darwin'):
             try:
-                self.vlc_player.set_nsobject(handle)
+                player.set_nsobject(handle)
             except Exception:
                 pass
 
-    def _stop_video(self):
-        if self.vlc_player:
+    def _watch_player_events(self, player):
+        """Forward player's libvlc events to the Tk loop; libvlc calls these on its own threads."""
+        last_second = [-1]
+
+        def on_event(event, kind):
+            value = None
+            if kind == 'time':
+                value = event.u.new_time
+                if value // 1000 == last_second[0]:
+                    return  # the UI only shows whole seconds
+                last_second[0] = value // 1000
+            elif kind == 'length':
+                value = event.u.new_length
+            elif kind == 'vout':
+                value = event.u.new_count
+            self._post_ui(self._on_video_event, player, kind, value)
+
+        em = player.event_manager()
+        for event_type, kind in ((vlc.EventType.MediaPlayerPlaying, 'playing'),
+                                 (vlc.EventType.MediaPlayerVout, 'vout'),
+                                 (vlc.EventType.MediaPlayerEndReached, 'end'),
+                                 (vlc.EventType.MediaPlayerEncounteredError, 'error'),
+                                 (vlc.EventType.MediaPlayerLengthChanged, 'length'),
+                                 (vlc.EventType.MediaPlayerTimeChanged, 'time')):
+            em.event_attach(event_type, on_event, kind)
+
+    def _on_video_event(self, player, kind, value):
+        if player is self._standby_player:
+            if self._standby_path is None:
+                return
+            if kind == 'playing' and not self._standby_primed:
+                self._standby_ready()
+            elif kind in ('end', 'error'):
+                self._cancel_standby()
+            return
+        if player is not self.vlc_player or self._video_path is None:
+            return
+        if kind in ('playing', 'time') and self.is_running and not self.is_paused:
+            self._arm_video_watchdog(VIDEO_STALL_SECONDS)
+        if kind == 'length':
+            if value and value > 0:
+                self._video_length_ms = value
+                self._show_video_progress()
+        elif kind == 'time':
+            self._video_time_ms = value
+            self._show_video_progress()
+        elif kind == 'vout':
+            if value:  # live video is rendering: it replaces the poster frame
+                self.video_panel.lift(self.image_panel)
+                self._panel_clear()
+        elif kind == 'end':
+            # a queued EndReached can belong to the media before a quick skip
+            if player.get_state() != vlc.State.Ended or not self.is_running or self.is_paused:
+                return
+            if self.loop_videos.get():
+                # libvlc can't restart a player from inside its own callback; we are on the Tk loop now
+                self._video_time_ms = 0
+                self._arm_video_watchdog(self.interval_seconds.get() + VIDEO_STALL_SECONDS)
+                player.stop()
+                player.play()
+            else:
+                self.play_next()
+        elif kind == 'error':
+            if player.get_state() != vlc.State.Error:
+                return
+            self.status_var.set('Could not play video, skipping: ' + os.path.basename(self._video_path))
+            if self.is_running and not self.is_paused:
+                self.play_next()
+
+    def _arm_video_watchdog(self, seconds):
+        self._cancel_video_watchdog()
+        self._video_watchdog_id = self.after(int(seconds * 1000), self._on_video_stalled)
+
+    def _cancel_video_watchdog(self):
+        if self._video_watchdog_id is not None:
+            self.after_cancel(self._video_watchdog_id)
+            self._video_watchdog_id = None
+
+    def _on_video_stalled(self):
+        # libvlc went quiet (a stalled network read, a file that never starts): move on
+        self._video_watchdog_id = None
+        if self._video_path is None or not self.is_running or self.is_paused:
+            return
+        self.status_var.set('Video stalled, skipping: ' + os.path.basename(self._video_path))
+        self.play_next()
+
+    def _show_video_progress(self):
+        length_ms, time_ms = self._video_length_ms, self._video_time_ms
+        if self.loop_videos.get():
+            limit_ms = length_ms
+        else:
+            # a video plays to its end, but no longer than the meme interval
+            interval_ms = self.interval_seconds.get() * 1000
+            limit_ms = min(length_ms, interval_ms) if length_ms > 0 else interval_ms
+            if time_ms >= interval_ms and self.is_running and not self.is_paused:
+                self.play_next()
+                return
+        self.progress['maximum'] = max(1, limit_ms // 1000)
+        self.progress['value'] = min(time_ms, limit_ms) // 1000
+        if limit_ms <= 0:
+            self.timer_label.config(text='Video: looping')
+        elif self.loop_videos.get():
+            self.timer_label.config(text=f'Video: {time_ms // 1000}s / {limit_ms // 1000}s (looping)')
+        else:
+            self.timer_label.config(text=f'Next meme in: {max(0, limit_ms - time_ms) // 1000}s')
+
+    # ---------------- Gapless video switching ----------------
+    def _prime_standby(self, path):
+        """Open path in the hidden standby player, muted, and pause it on its first frame."""
+        if path == self._standby_path:
+            return
+        self._cancel_standby()
+        if path is None or not self.vlc_player or self.vlc_instance is None:
+            return
+        try:
+            if self._standby_player is None:
+                self._standby_player = self.vlc_instance.media_player_new()
+                self._watch_player_events(self._standby_player)
+            media = self._preloaded_media.pop(path, None)
+            if media is None:
+                media = new_vlc_media(self.proxies.lookup(path) or path)
+            self._standby_rss = process_rss_bytes()
+            player = self._standby_player
+            player.set_media(media)
+            self._release_media(media)
+            self._attach_player(player, self._standby_panel)
+            player.audio_set_mute(True)
+            player.play()
+        except Exception:
+            return
+        self._standby_path = path
+        self._standby_primed = False
+        # the Playing event primes it (_standby_ready); this only fires if that never comes
+        self._standby_after_id = self.after(int(STANDBY_PRIME_TIMEOUT_SECONDS * 1000), self._cancel_standby)
+
+    def _standby_ready(self):
+        if self._standby_after_id is not None:
+            self.after_cancel(self._standby_after_id)
+            self._standby_after_id = None
+        player = self._standby_player
+        try:
+            player.set_pause(1)
+            player.set_time(0)
+            player.audio_set_mute(True)  # mute can be lost while the audio output opens
+        except Exception:
+            self._cancel_standby()
+            return
+        self._standby_primed = True
+        rss = process_rss_bytes()
+        if rss is not None and self._standby_rss is not None:
+            self._standby_cost = max(0, rss - self._standby_rss)
+
+    def _cancel_standby(self):
+        if self._standby_after_id is not None:
             try:
-                self.vlc_player.stop()
+                self.after_cancel(self._standby_after_id)
+            except Exception:
+                pass
+            self._standby_after_id = None
+        if self._standby_path is not None and self._standby_player is not None:
+            try:
+                self._standby_player.stop()
             except Exception:
                 pass
-        if self._video_stop_timer:
+        self._standby_path = None
+        self._standby_primed = False
+
+    def _swap_in_standby(self):
+        # the primed player becomes the active one, shown on top, and the old one stands by
+        old_player, old_panel = self.vlc_player, self.video_panel
+        self.vlc_player, self.video_panel = self._standby_player, self._standby_panel
+        self._standby_player, self._standby_panel = old_player, old_panel
+        self._standby_path = None
+        self._standby_primed = False
+        self.video_panel.lift(self.image_panel)
+        old_panel.lower()
+        self.update_idletasks()  # the swap is on screen before the old player is torn down
+        try:
+            self.vlc_player.audio_set_volume(int(self.bgm_volume.get()))
+            self.vlc_player.audio_set_mute(False)
+            self.vlc_player.set_pause(0)
+        except Exception:
+            pass
+        try:
+            old_player.stop()
+        except Exception:
+            pass
+
+    def _stop_video(self):
+        if self.vlc_player:
             try:
-                self._video_stop_timer.cancel()
+                self.vlc_player.stop()
             except Exception:
                 pass
-            self._video_stop_timer = None
+        self._video_path = None
+        self._cancel_video_watchdog()
+        self.proxies.set_busy(False)
 
     # ---------------- SFX playback ----------------
     def _pick_random_sfx(self):
@@ -773,39 +4414,8 @@ class MemePlayer(tk.Tk):
         if not sfx_path or not os.path.exists(sfx_path):
             return
         # Try VLC for cross-format play
-        if VLC_AVAILABLE:
-            try:
-                if not self.vlc_instance:
-                    self.vlc_instance = vlc.Instance()
-                sfx_player = self.vlc_instance.media_player_new()
-                media = vlc.Media(sfx_path)
-                sfx_player.set_media(media)
-                try:
-                    sfx_player.audio_set_volume(int(self.sfx_volume.get()))
-                except Exception:
-                    pass
-                sfx_player.play()
-
-                def stop_player_later(player):
-                    try:
-                        time.sleep(0.2)
-                        length_ms = player.get_length()
-                        if length_ms and length_ms > 0:
-                            time.sleep((length_ms / 1000.0) * 1.1)
-                        else:
-                            time.sleep(2.0)
-                        try:
-                            player.stop()
-                        except Exception:
-                            pass
-                    except Exception:
-                        pass
-
-                t = threading.Thread(target=stop_player_later, args=(sfx_player,), daemon=True)
-                t.start()
-                return
-            except Exception:
-                pass
+        if VLC_AVAILABLE and self.sfx_voices.play(sfx_path, self.sfx_volume.get()):
+            return
         # winsound fallback for wav on Windows
         if WINSOUND_AVAILABLE and sfx_path.lower().endswith('.wav'):
             try:
@@ -857,8 +4467,25 @@ class MemePlayer(tk.Tk):
                 pass
 
     def _on_sfx_volume_change(self, _val):
-        # affects future SFX players (VLC)
-        pass
+        # sounds already playing follow the slider too
+        self.sfx_voices.set_volume(self.sfx_volume.get())
+
+    # ---------------- Worker -> UI marshalling ----------------
+    def _post_ui(self, func, *args):
+        """Queue func(*args) to run on the Tk thread. Safe to call from any thread."""
+        self._ui_queue.put((func, args))
+
+    def _drain_ui_queue(self):
+        while True:
+            try:
+                func, args = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception:
+                pass
+        self.after(UI_POLL_MS, self._drain_ui_queue)
 
     # ---------------- Playlists / helpers ----------------
     def _safe_status_set(self, text):
@@ -885,6 +4512,19 @@ class MemePlayer(tk.Tk):
 
     # ---------------- Save/exit ----------------
     def on_close(self):
+        self._cancel_scan()
+        self._stop_watcher()
+        self.search_index.close()
+        self.prober.close()
+        self.proxies.close()
+        self.close_grid_view()
+        self.prefetcher.close()
+        self.readahead.close()
+        self.refiner.close()
+        self.thumbnailer.close()
+        self.image_loader.close()
+        self.disk_cache.close()
+        self.catalog.close()
         # cleanup bgm
         try:
             self.bgm.stop()
@@ -897,6 +4537,15 @@ class MemePlayer(tk.Tk):
             except Exception:
                 pass
         self.stop()
+        self.sfx_voices.close()
+        if self._standby_player is not None:
+            try:
+                self._standby_player.release()
+            except Exception:
+                pass
+        for media in self._preloaded_media.values():
+            self._release_media(media)
+        self._preloaded_media.clear()
         self.destroy()
 
 
@@ -927,6 +4576,142 @@ def simple_input_dialog(parent, title, prompt):
     return result['value']
 
 
+# ---------------- Benchmarks ----------------
+def benchmark_image_decode(folder, size=(800, 450), limit=50):
+    """Compare draft and full JPEG decoding on up to `limit` JPEGs under folder:
+    mean time per image and mean megapixels actually decoded (the peak buffer).
+    """
+    paths = []
+    for root, _dirs, names in os.walk(folder):
+        paths.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith(('.jpg', '.jpeg')))
+        if len(paths) >= limit:
+            break
+    paths = paths[:limit]
+    if not paths:
+        print('No JPEG files found in', folder)
+        return
+    print(f'{len(paths)} JPEGs, target {size[0]}x{size[1]}')
+    for draft in (False, True):
+        loader = ImageLoader(draft=draft)
+        elapsed = 0.0
+        decoded_px = 0
+        for p in paths:
+            with Image.open(p) as img:
+                if draft:
+                    img.draft(None, size)
+                decoded_px += img.size[0] * img.size[1]
+            start = time.perf_counter()
+            loader.load(p, size)
+            elapsed += time.perf_counter() - start
+        print(f'  {"draft" if draft else "full "}: {elapsed / len(paths) * 1000:7.1f} ms/image, '
+              f'{decoded_px / len(paths) / 1e6:6.2f} MP decoded/image')
+
+
+def benchmark_decode_backends(folder, size=(800, 450), limit=40, workers=4):
+    """Decode up to `limit` images under folder with `workers` threads, then with
+    a pool of `workers` processes. Reports wall time and the worst stall of a
+    5 ms ticker on the calling thread, standing in for the Tk loop.
+    """
+    paths = []
+    for root, _dirs, names in os.walk(folder):
+        paths.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith(IMAGE_EXTS))
+        if len(paths) >= limit:
+            break
+    paths = paths[:limit]
+    if not paths:
+        print('No images found in', folder)
+        return
+    print(f'{len(paths)} images, target {size[0]}x{size[1]}, {workers} workers')
+    for name in ('threads', 'processes'):
+        if name == 'threads':
+            loader = ImageLoader()
+            pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        else:
+            loader = ProcessImageLoader(workers=workers)
+            loader.decode(paths[0], size)  # start the worker processes outside the timing
+            pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        start = time.perf_counter()
+        futures = [pool.submit(loader.decode, p, size) for p in paths]
+        worst = 0.0
+        last = time.perf_counter()
+        while not all(f.done() for f in futures):
+            time.sleep(0.005)
+            now = time.perf_counter()
+            worst = max(worst, now - last - 0.005)
+            last = now
+        elapsed = time.perf_counter() - start
+        failed = sum(1 for f in futures if f.exception() is not None)
+        pool.shutdown()
+        loader.close()
+        print(f'  {name:9}: {elapsed:6.2f} s total, {elapsed / len(paths) * 1000:7.1f} ms/image, '
+              f'worst UI-thread stall {worst * 1000:6.1f} ms' + (f', {failed} failed' if failed else ''))
+
+
+# ---------------- Oversized image helper ----------------
+def shrink_image_to_file(path, size, out):
+    """Child-process side of ImageLoader._decode_in_child: full decode of an
+    oversized image, capped at PROXY_MEMORY_LIMIT_BYTES of address space where
+    the OS supports it, resized to fit size and written to out as PNG.
+    """
+    try:
+        import resource
+        cap = PROXY_MEMORY_LIMIT_BYTES + 1024 * 1024 * 1024  # plus the interpreter and libraries
+        resource.setrlimit(resource.RLIMIT_AS, (cap, cap))
+    except Exception:
+        pass
+    ImageLoader(memory_limit=None).decode(path, size).save(out, 'PNG')
+
+
+def transcode_video_proxy(src, dst):
+    """Child-process side of VideoProxyCache: transcode src with libvlc's stream
+    output into an H.264/AAC MP4 of VIDEO_PROXY_HEIGHT lines at dst.
+    Exit status 0 when written, 3 when src is light enough to play as it is.
+    """
+    try:
+        os.nice(19)  # Windows gets IDLE_PRIORITY_CLASS from the parent instead
+    except (AttributeError, OSError):
+        pass
+    if not VLC_AVAILABLE:
+        return 1
+    instance = vlc.Instance(['--quiet', '--no-stats', '--no-lua', '--vout=dummy', '--aout=dummy',
+                             '--avcodec-threads=1', '--no-sub-autodetect-file'])
+    media = instance.media_new(src)
+    media.parse_with_options(vlc.MediaParseFlag.local, int(PROBE_TIMEOUT_SECONDS * 1000))
+    deadline = time.monotonic() + PROBE_TIMEOUT_SECONDS
+    while int(media.get_parsed_status()) == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    width = height = 0
+    for track in media.tracks_get() or ():
+        if track.type == vlc.TrackType.video:
+            width, height = track.video.contents.width, track.video.contents.height
+            break
+    if not video_needs_proxy(width, height, max(0, media.get_duration()), os.path.getsize(src)):
+        return 3
+    chain = (f'#transcode{{vcodec=h264,venc=x264{{preset=veryfast}},vb={VIDEO_PROXY_KBPS},'
+             f'height={VIDEO_PROXY_HEIGHT},acodec=mp4a,ab=128,channels=2,threads=1}}'
+             f':std{{access=file,mux=mp4,dst="{dst}"}}')
+    media.add_option(':sout=' + chain)
+    player = instance.media_player_new()
+    player.set_media(media)
+    player.play()
+    while player.get_state() not in (vlc.State.Ended, vlc.State.Error, vlc.State.Stopped):
+        time.sleep(0.5)
+    failed = player.get_state() == vlc.State.Error
+    player.stop()  # flushes and closes the muxer
+    player.release()
+    media.release()
+    return 1 if failed or not os.path.exists(dst) else 0
+
+
 if __name__ == '__main__':
-    app = MemePlayer()
-    app.mainloop()
+    if len(sys.argv) > 2 and sys.argv[1] == '--bench-decode':
+        benchmark_image_decode(sys.argv[2])
+    elif len(sys.argv) > 2 and sys.argv[1] == '--bench-backends':
+        benchmark_decode_backends(sys.argv[2])
+    elif len(sys.argv) > 5 and sys.argv[1] == '--shrink':
+        shrink_image_to_file(sys.argv[2], (int(sys.argv[3]), int(sys.argv[4])), sys.argv[5])
+    elif len(sys.argv) > 3 and sys.argv[1] == '--transcode-proxy':
+        sys.exit(transcode_video_proxy(sys.argv[2], sys.argv[3]))
+    else:
+        app = MemePlayer()
+        app.mainloop()
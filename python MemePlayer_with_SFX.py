@@ -41,6 +41,65 @@ SFX_EXTS = ('.wav', '.mp3', '.ogg', '.flac', '.m4a', '.aac')
 
 ASSETS_SFX_DIR = os.path.join(os.path.dirname(__file__), 'assets', 'sfx')
 
+# Sound effects share this many reusable players; when all are busy the sound
+# started longest ago is cut off for the new one
+SFX_VOICES = 4
+
+
+class SfxVoicePool:
+    """Fixed set of VLC players ("voices") for sound effects, created as needed
+    up to `voices` and reused for every sound after that. An idle or finished
+    voice is taken first; with all of them busy, the one started longest ago
+    is stopped and reused. No thread per sound, and each voice only holds the
+    media of its current sound.
+    """
+
+    def __init__(self, voices=SFX_VOICES):
+        self.voices = max(1, voices)
+        self._voices = []  # [player, time.monotonic() of its last play()]
+
+    def play(self, instance, path, volume):
+        voice = self._take_voice(instance)
+        player = voice[0]
+        media = instance.media_new(path)
+        player.set_media(media)
+        media.release()  # the player keeps its own reference until the next set_media
+        try:
+            player.audio_set_volume(int(volume))
+        except Exception:
+            pass
+        player.play()
+        voice[1] = time.monotonic()
+
+    def _take_voice(self, instance):
+        done = (vlc.State.NothingSpecial, vlc.State.Stopped, vlc.State.Ended, vlc.State.Error)
+        for voice in self._voices:
+            if voice[0].get_state() in done:
+                return voice
+        if len(self._voices) < self.voices:
+            voice = [instance.media_player_new(), 0.0]
+            self._voices.append(voice)
+            return voice
+        voice = min(self._voices, key=lambda v: v[1])  # steal the oldest sound
+        voice[0].stop()
+        return voice
+
+    def set_volume(self, volume):
+        for player, _started in self._voices:
+            try:
+                player.audio_set_volume(int(volume))
+            except Exception:
+                pass
+
+    def close(self):
+        for player, _started in self._voices:
+            try:
+                player.stop()
+                player.release()
+            except Exception:
+                pass
+        self._voices = []
+
 
 class MemePlayer(tk.Tk):
     def __init__(self):
@@ -66,6 +125,7 @@ class MemePlayer(tk.Tk):
         self.sfx_files = []
         self.enable_image_sfx = tk.BooleanVar(value=True)
         self.sfx_volume = tk.IntVar(value=80)
+        self.sfx_voices = SfxVoicePool()
 
         self._after_id = None
         self._video_stop_timer = None
@@ -202,42 +262,13 @@ class MemePlayer(tk.Tk):
         if not sfx_path or not os.path.exists(sfx_path):
             return  # no sfx available
 
-        # If VLC available, use a temporary vlc.MediaPlayer for the SFX
+        # If VLC available, play it on one of the pooled SFX voices
         if VLC_AVAILABLE:
             try:
                 # ensure vlc instance exists (don't override main player)
                 if not self.vlc_instance:
                     self.vlc_instance = vlc.Instance()
-                # ephemeral player so it doesn't affect video player
-                sfx_player = self.vlc_instance.media_player_new()
-                media = vlc.Media(sfx_path)
-                sfx_player.set_media(media)
-                try:
-                    sfx_player.audio_set_volume(int(self.sfx_volume.get()))
-                except Exception:
-                    pass
-                sfx_player.play()
-
-                # schedule a cleanup after estimated duration (non-blocking)
-                def stop_player_later(player):
-                    try:
-                        # wait a bit for length to become available
-                        time.sleep(0.2)
-                        length_ms = player.get_length()
-                        if length_ms and length_ms > 0:
-                            time.sleep((length_ms / 1000.0) * 1.1)
-                        else:
-                            # fallback short sleep
-                            time.sleep(2.0)
-                        try:
-                            player.stop()
-                        except Exception:
-                            pass
-                    except Exception:
-                        pass
-
-                t = threading.Thread(target=stop_player_later, args=(sfx_player,), daemon=True)
-                t.start()
+                self.sfx_voices.play(self.vlc_instance, sfx_path, self.sfx_volume.get())
                 return
             except Exception:
                 # If VLC fails for SFX, fallthrough to winsound fallback
@@ -252,8 +283,8 @@ class MemePlayer(tk.Tk):
         # else: no cross-platform builtin audio; skip
 
     def _on_sfx_volume_change(self, _val):
-        # volume applied to future SFX players (VLC); winsound has no volume control here
-        pass
+        # applies to sounds already playing too (VLC); winsound has no volume control here
+        self.sfx_voices.set_volume(self.sfx_volume.get())
 
     # ----------------- File / playback helpers -----------------
     def select_folder(self):
@@ -508,6 +539,7 @@ class MemePlayer(tk.Tk):
     def on_close(self):
         # stop players and exit
         self.stop()
+        self.sfx_voices.close()
         self.destroy()
 
 
@@ -0,0 +1,39 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import MemePlayer_full as mp  # noqa: E402
+
+
+def _scan(folder, catalog, cancel_after=None):
+    found = []
+    scanner = mp.FolderScanner(folder, lambda s, paths: found.extend(paths), lambda s: None, catalog=catalog)
+    if cancel_after is not None:
+        list_dir = scanner._list_dir
+
+        def cancelling_list_dir(path, parent):
+            entries = list_dir(path, parent)
+            if path == cancel_after:
+                scanner.cancel()
+            return entries
+        scanner._list_dir = cancelling_list_dir
+    scanner._run()  # on this thread
+    return found
+
+
+def test_cancelled_scan_keeps_unvisited_subfolders(tmp_path):
+    folder = str(tmp_path / 'media')
+    a = os.path.join(folder, 'A')
+    b = os.path.join(a, 'B')
+    os.makedirs(b)
+    for p in (os.path.join(a, '1.png'), os.path.join(b, '2.png')):
+        open(p, 'wb').close()
+    catalog = mp.MediaCatalog(str(tmp_path / 'catalog.sqlite3'))
+    try:
+        _scan(folder, catalog, cancel_after=a)  # A is listed, A/B is not
+        expected = [os.path.join(a, '1.png'), os.path.join(b, '2.png')]
+        assert _scan(folder, catalog) == expected
+        assert catalog.cached_files(folder) == expected
+    finally:
+        catalog.close()